@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+
+from app.db.executor import db_executor
+from app.services.container import batch_service
+from app.models.requests.batch_request import BatchRequest
+from app.models.views.batch_result import BatchResult
+
+router = APIRouter(prefix="/api/batch", tags=["batch"])
+
+
+@router.post("", response_model=BatchResult)
+async def apply_batch(req: BatchRequest):
+    return await db_executor.run(batch_service.apply, req.operations)
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from typing import List
 
+from app.api.conditional import not_modified
+from app.db.executor import db_executor
 from app.services.container import category_service
 from app.models.category import Category
 from app.models.requests.category_request import (
@@ -16,13 +18,20 @@ router = APIRouter(prefix="/api/categories", tags=["categories"])
 # --------------------------------------------------
 
 @router.get("", response_model=List[Category])
-def list_categories():
-    return category_service.list_all()
+async def list_categories(request: Request, response: Response):
+    cached = not_modified(
+        request, response, await db_executor.run(category_service.etag)
+    )
+    if cached:
+        return cached
+
+    # cached, but a cold cache loads from the DB
+    return await db_executor.run(category_service.list_all)
 
 
 @router.get("/{category_id}", response_model=Category)
-def get_category(category_id: str):
-    category = category_service.get_by_id(category_id)
+async def get_category(category_id: str):
+    category = await db_executor.run(category_service.get_by_id, category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     return category
@@ -33,9 +42,9 @@ def get_category(category_id: str):
 # --------------------------------------------------
 
 @router.post("", response_model=Category)
-def create_category(data: CategoryCreateRequest):
+async def create_category(data: CategoryCreateRequest):
     try:
-        return category_service.create(data.name)
+        return await db_executor.run(category_service.create, data.name)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -45,9 +54,9 @@ def create_category(data: CategoryCreateRequest):
 # --------------------------------------------------
 
 @router.put("/{category_id}", response_model=Category)
-def update_category(category_id: str, data: CategoryUpdateRequest):
+async def update_category(category_id: str, data: CategoryUpdateRequest):
     try:
-        updated = category_service.update(category_id, data.name)
+        updated = await db_executor.run(category_service.update, category_id, data.name)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -62,8 +71,8 @@ def update_category(category_id: str, data: CategoryUpdateRequest):
 # --------------------------------------------------
 
 @router.delete("/{category_id}")
-def delete_category(category_id: str):
-    ok = category_service.delete(category_id)
+async def delete_category(category_id: str):
+    ok = await db_executor.run(category_service.delete, category_id)
 
     if not ok:
         raise HTTPException(status_code=404, detail="Category not found or protected")
@@ -0,0 +1,36 @@
+from typing import Optional
+
+from fastapi import Request, Response
+
+
+def not_modified(
+    request: Request,
+    response: Response,
+    etag: str,
+) -> Optional[Response]:
+    """
+    Tag the response with `etag` and return a 304 response when the
+    client already holds that version (If-None-Match), otherwise None.
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=dict(response.headers))
+
+    return None
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        # If-None-Match uses the weak comparison
+        if candidate.removeprefix("W/") == etag:
+            return True
+
+    return False
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+
+from app.db.executor import db_executor
+from app.services.container import home_service
+from app.models.views.home_snapshot import HomeSnapshot
+
+router = APIRouter(prefix="/api/home", tags=["home"])
+
+
+@router.get("", response_model=HomeSnapshot)
+async def get_home():
+    return await db_executor.run(home_service.snapshot)
@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+
+from app.db.executor import db_executor
+from app.db.maintenance import db_maintenance
+from app.models.views.maintenance_report import MaintenanceRun, MaintenanceStatus
+
+router = APIRouter(prefix="/api/maintenance", tags=["maintenance"])
+
+
+@router.get("", response_model=MaintenanceStatus)
+async def get_status():
+    # waits for a running maintenance pass
+    return await db_executor.run(db_maintenance.status)
+
+
+@router.post("/run", response_model=MaintenanceRun)
+async def run_now():
+    return await db_executor.run(db_maintenance.run_once, True)
@@ -1,9 +1,18 @@
-from fastapi import APIRouter, Query, HTTPException
-from typing import List
+from fastapi import APIRouter, Query, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional
 
+from app.api.conditional import not_modified
+from app.db.executor import db_executor
 from app.services.container import product_service
 from app.models.product import Product
 from app.models.views.product_view import ProductView
+from app.models.views.import_result import ImportResult
+from app.services.product_transfer import (
+    ProductImportReader,
+    csv_lines,
+    ndjson_lines,
+)
 from app.models.requests.product_request import (
     ProductCreateRequest,
     ProductUpdateRequest,
@@ -17,20 +26,78 @@ router = APIRouter(prefix="/api/products", tags=["products"])
 # --------------------------------------------------
 
 @router.get("", response_model=List[ProductView])
-def list_products(limit: int = 200):
-    return product_service.list_all(limit)
+async def list_products(
+    request: Request,
+    response: Response,
+    limit: int = Query(200, ge=1, le=1000),
+    cursor: Optional[str] = None,
+):
+    cached = not_modified(
+        request, response, await db_executor.run(product_service.etag)
+    )
+    if cached:
+        return cached
+
+    try:
+        items, next_cursor = await db_executor.run(
+            product_service.list_page, limit, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    return items
+
+
+@router.get("/stream")
+def stream_products(cursor: Optional[str] = None):
+    try:
+        rows = product_service.stream_rows(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(ndjson_lines(rows), media_type="application/x-ndjson")
+
+
+@router.get("/export")
+def export_products(format: Literal["csv", "ndjson"] = "csv"):
+    rows = product_service.stream_rows()
+
+    if format == "ndjson":
+        return StreamingResponse(
+            ndjson_lines(rows),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": "attachment; filename=products.ndjson"},
+        )
+
+    return StreamingResponse(
+        csv_lines(rows),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": "attachment; filename=products.csv"},
+    )
 
 
 @router.get("/autocomplete", response_model=List[ProductView])
-def autocomplete(
+async def autocomplete(
     q: str = Query(..., min_length=2),
 ):
-    return product_service.autocomplete(q)
+    # in-memory index, but it waits for its lock during a reindex
+    return await db_executor.run(product_service.autocomplete, q)
+
+
+@router.get("/search", response_model=List[ProductView])
+async def search(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+):
+    return await db_executor.run(product_service.search, q, limit)
 
 
 @router.get("/{product_id}", response_model=ProductView)
-def get_product(product_id: str):
-    product = product_service.get_view_by_id(product_id)
+async def get_product(product_id: str):
+    product = await db_executor.run(product_service.get_view_by_id, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     return product
@@ -41,9 +108,10 @@ def get_product(product_id: str):
 # --------------------------------------------------
 
 @router.post("", response_model=Product)
-def create_product(data: ProductCreateRequest):
+async def create_product(data: ProductCreateRequest):
     try:
-        return product_service.create(
+        return await db_executor.run(
+            product_service.create,
             name=data.name,
             category_name=data.category_name,
         )
@@ -51,17 +119,38 @@ def create_product(data: ProductCreateRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/import", response_model=ImportResult)
+async def import_products(request: Request):
+    try:
+        reader = ProductImportReader(request.headers.get("content-type", ""))
+        async for chunk in request.stream():
+            reader.feed(chunk)
+        reader.close()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return await db_executor.run(
+        product_service.import_products,
+        reader.rows,
+        reader.errors,
+    )
+
+
 # --------------------------------------------------
 # UPDATE
 # --------------------------------------------------
 
 @router.put("/{product_id}", response_model=Product)
-def update_product(product_id: str, data: ProductUpdateRequest):
-    updated = product_service.update(
-        product_id=product_id,
-        name=data.name,
-        category_name=data.category_name,
-    )
+async def update_product(product_id: str, data: ProductUpdateRequest):
+    try:
+        updated = await db_executor.run(
+            product_service.update,
+            product_id=product_id,
+            name=data.name,
+            category_name=data.category_name,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     if not updated:
         raise HTTPException(status_code=404, detail="Product not found")
@@ -74,8 +163,8 @@ def update_product(product_id: str, data: ProductUpdateRequest):
 # --------------------------------------------------
 
 @router.delete("/{product_id}")
-def delete_product(product_id: str):
-    ok = product_service.delete(product_id)
+async def delete_product(product_id: str):
+    ok = await db_executor.run(product_service.delete, product_id)
 
     if not ok:
         raise HTTPException(status_code=404, detail="Product not found")
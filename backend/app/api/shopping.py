@@ -1,9 +1,22 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+import asyncio
+
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+)
+from pydantic import BaseModel, Field
 from typing import Optional, List
 
-from app.services.container import shopping_service
+from app.api.conditional import not_modified
+from app.db.executor import db_executor
+from app.services.container import shopping_service, shopping_events
+from app.services.event_hub import OVERFLOW
 from app.models.views.shopping_item_view import ShoppingItemView
+from app.models.views.shopping_change_view import ShoppingChangesView
 from app.models.shopping_list import ShoppingList
 
 router = APIRouter(prefix="/api/shopping", tags=["shopping"])
@@ -14,37 +27,102 @@ class AddItemRequest(BaseModel):
     category: Optional[str] = None
 
 
+class AddItemsRequest(BaseModel):
+    items: List[AddItemRequest] = Field(..., min_items=1, max_items=500)
+
+
 @router.get("/list", response_model=ShoppingList)
-def get_current_list():
-    return shopping_service.get_current_list()
+async def get_current_list():
+    return await db_executor.run(shopping_service.get_current_list)
 
 
 @router.get("/items", response_model=List[ShoppingItemView])
-def list_items():
-    return shopping_service.list_items()
+async def list_items(request: Request, response: Response):
+    cached = not_modified(
+        request, response, await db_executor.run(shopping_service.etag)
+    )
+    if cached:
+        return cached
+
+    # read before the items: replaying changes the list already has is harmless
+    seq = await db_executor.run(shopping_service.change_seq)
+    response.headers["X-Change-Seq"] = str(seq)
+    return await db_executor.run(shopping_service.list_items)
+
+
+@router.get("/changes", response_model=ShoppingChangesView)
+async def list_changes(
+    since: int = Query(..., ge=0),
+    limit: int = Query(500, ge=1, le=5000),
+):
+    return await db_executor.run(shopping_service.changes_since, since, limit)
 
 
 @router.post("/items", response_model=ShoppingItemView)
-def add_item(req: AddItemRequest):
+async def add_item(req: AddItemRequest):
     try:
-        return shopping_service.add_item(req.name, req.category)
+        return await db_executor.run(shopping_service.add_item, req.name, req.category)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/items:batch", response_model=List[ShoppingItemView])
+async def add_items(req: AddItemsRequest):
+    try:
+        return await db_executor.run(
+            shopping_service.add_items,
+            [(item.name, item.category) for item in req.items],
+        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/done", response_model=ShoppingList)
-def done():
-    return shopping_service.done()
+async def done():
+    return await db_executor.run(shopping_service.done)
 
 @router.patch("/items/{item_id}")
-def update_quantity(item_id: str, data: dict):
-    shopping_service.update_quantity(
+async def update_quantity(item_id: str, data: dict):
+    await db_executor.run(
+        shopping_service.update_quantity,
         item_id,
         data["quantity"]
     )
     return {"ok": True}
 
 @router.delete("/items/{item_id}")
-def delete_item(item_id: str):
-    shopping_service.delete_item(item_id)
-    return {"ok": True}
\ No newline at end of file
+async def delete_item(item_id: str):
+    await db_executor.run(shopping_service.delete_item, item_id)
+    return {"ok": True}
+
+
+@router.websocket("/ws")
+async def shopping_socket(websocket: WebSocket):
+    # push-only: edits of every client are broadcast to all sockets;
+    # clients catch up via /changes after (re)connecting
+    await websocket.accept()
+    queue = shopping_events.subscribe()
+
+    async def send():
+        while True:
+            event = await queue.get()
+            if event is OVERFLOW:
+                # fell behind: client reconnects and resyncs
+                await websocket.close(code=1013)
+                return
+            await websocket.send_json(event)
+
+    async def receive():
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+    tasks = [asyncio.create_task(send()), asyncio.create_task(receive())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        shopping_events.unsubscribe(queue)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,10 +1,21 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+import json
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
-from app.services.container import timer_service
+from app.api.conditional import not_modified
+from app.db.executor import db_executor
+from app.services.container import timer_service, timer_events
+from app.services.event_hub import OVERFLOW
+from app.services.timer_service import TimerNotFoundError
 
 router = APIRouter(prefix="/api/timers")
 
+# full resync sent to every stream; doubles as keep-alive
+SNAPSHOT_INTERVAL_SEC = 30
+
 
 class CreateTimerRequest(BaseModel):
     duration_sec: int
@@ -12,27 +23,79 @@ class CreateTimerRequest(BaseModel):
 
 
 @router.post("")
-def create_timer(req: CreateTimerRequest):
-    return timer_service.create(name=req.name, duration_sec=req.duration_sec)
+async def create_timer(req: CreateTimerRequest):
+    return await db_executor.run(
+        timer_service.create,
+        name=req.name,
+        duration_sec=req.duration_sec,
+    )
 
 
 @router.get("")
-def list_timers():
-    return timer_service.list_timers()
+async def list_timers(request: Request, response: Response):
+    cached = not_modified(
+        request, response, await db_executor.run(timer_service.etag)
+    )
+    if cached:
+        return cached
+
+    return await db_executor.run(timer_service.list_timers)
+
+
+@router.get("/stream")
+async def stream_timers(request: Request):
+    queue = timer_events.subscribe()
+
+    async def events():
+        try:
+            snapshot = await db_executor.run(timer_service.snapshot)
+            yield _sse(snapshot)
+
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), timeout=SNAPSHOT_INTERVAL_SEC
+                    )
+                except asyncio.TimeoutError:
+                    event = await db_executor.run(timer_service.snapshot)
+
+                if event is OVERFLOW:
+                    break
+
+                yield _sse(event)
+        finally:
+            timer_events.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.post("/{timer_id}/pause")
-def pause_timer(timer_id: str):
-    return timer_service.pause(timer_id)
+async def pause_timer(timer_id: str):
+    try:
+        return await db_executor.run(timer_service.pause, timer_id)
+    except TimerNotFoundError:
+        raise HTTPException(status_code=404, detail="Timer not found")
 
 @router.post("/{timer_id}/start")
-def start_timer(timer_id: str):
-    return timer_service.start(timer_id)
+async def start_timer(timer_id: str):
+    try:
+        return await db_executor.run(timer_service.start, timer_id)
+    except TimerNotFoundError:
+        raise HTTPException(status_code=404, detail="Timer not found")
 
 
 @router.delete("/{timer_id}")
-def delete_timer_endpoint(timer_id: str):
-    ok = timer_service.delete_timer(timer_id)
-    if not ok:
+async def delete_timer_endpoint(timer_id: str):
+    try:
+        await db_executor.run(timer_service.delete_timer, timer_id)
+    except TimerNotFoundError:
         raise HTTPException(status_code=404, detail="Timer not found")
     return {"status": "deleted"}
+
+
+def _sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
@@ -1,73 +1,108 @@
+import json
+import time
 import uuid
-from typing import List, Optional
-
-from app.db.connection import get_connection
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from app.db.connection import get_connection, get_read_connection
+from app.db.shopping_change_repository import LOG_CHANGE_SQL
+from app.db.shopping_item_repository import VIEW_SQL
+from app.db.write_queue import write_op
+from app.db.uuid_key import to_key
 from app.models.category import Category
+from app.models.views.shopping_item_view import ShoppingItemView
 
 
 DEFAULT_CATEGORY_ID = "00000000-0000-0000-0000-000000000000"
 DEFAULT_CATEGORY_NAME = "Other"
 
 
+@dataclass
+class CategoryDeletion:
+    # products merged into a same-named product of the default category
+    merged_product_ids: List[str]
+    # active list items that moved over to the kept product
+    moved_items: List[ShoppingItemView]
+
+
 class CategoryRepository:
 
     def get_conn(self):
         return get_connection()
 
+    def get_read_conn(self):
+        return get_read_connection()
+
     # --------------------------------------------------
     # CREATE
     # --------------------------------------------------
 
+    @write_op
     def create(self, name: str) -> Category:
-        category_id = str(uuid.uuid4())
-
-        conn = self.get_conn()
-        conn.execute(
-            """
-            INSERT INTO category (id, name)
-            VALUES (?, ?)
-            """,
-            (category_id, name),
-        )
-        conn.commit()
-
-        return Category(id=category_id, name=name)
+        # the existing row if another writer created the name meanwhile
+        with self.get_conn() as conn:
+            conn.execute(
+                """
+                INSERT INTO category (id, name)
+                VALUES (?, ?)
+                ON CONFLICT DO NOTHING
+                """,
+                (uuid.uuid4().bytes, name),
+            )
+            row = conn.execute(
+                "SELECT * FROM category WHERE name = ?", (name,)
+            ).fetchone()
+            conn.commit()
+
+        return Category(**dict(row))
+
+    @write_op
+    def ensure_default_exists(self) -> None:
+        with self.get_conn() as conn:
+            conn.execute(
+                """
+                INSERT OR IGNORE INTO category (id, name)
+                VALUES (?, ?)
+                """,
+                (to_key(DEFAULT_CATEGORY_ID), DEFAULT_CATEGORY_NAME),
+            )
+            conn.commit()
 
     # --------------------------------------------------
     # READ
     # --------------------------------------------------
 
     def get_by_id(self, category_id: str) -> Optional[Category]:
-        conn = self.get_conn()
-        row = conn.execute(
-            """
-            SELECT * FROM category WHERE id = ?
-            """,
-            (category_id,),
-        ).fetchone()
+        with self.get_read_conn() as conn:
+            row = conn.execute(
+                """
+                SELECT * FROM category WHERE id = ?
+                """,
+                (to_key(category_id),),
+            ).fetchone()
 
         return Category(**dict(row)) if row else None
 
     def get_by_name(self, name: str) -> Optional[Category]:
-        conn = self.get_conn()
-        row = conn.execute(
-            """
-            SELECT * FROM category
-            WHERE LOWER(name) = LOWER(?)
-            """,
-            (name,),
-        ).fetchone()
+        with self.get_read_conn() as conn:
+            row = conn.execute(
+                """
+                SELECT * FROM category
+                WHERE LOWER(name) = LOWER(?)
+                """,
+                (name,),
+            ).fetchone()
 
         return Category(**dict(row)) if row else None
 
     def list_all(self) -> List[Category]:
-        conn = self.get_conn()
-        rows = conn.execute(
-            """
-            SELECT * FROM category
-            ORDER BY name ASC
-            """
-        ).fetchall()
+        with self.get_read_conn() as conn:
+            rows = conn.execute(
+                """
+                SELECT * FROM category
+                ORDER BY name ASC
+                """
+            ).fetchall()
 
         return [Category(**dict(r)) for r in rows]
 
@@ -75,20 +110,21 @@ class CategoryRepository:
     # UPDATE
     # --------------------------------------------------
 
+    @write_op
     def update(self, category_id: str, new_name: str) -> bool:
         if category_id == DEFAULT_CATEGORY_ID:
             return False  # protect default category
 
-        conn = self.get_conn()
-        cur = conn.execute(
-            """
-            UPDATE category
-            SET name = ?
-            WHERE id = ?
-            """,
-            (new_name, category_id),
-        )
-        conn.commit()
+        with self.get_conn() as conn:
+            cur = conn.execute(
+                """
+                UPDATE category
+                SET name = ?
+                WHERE id = ?
+                """,
+                (new_name, to_key(category_id)),
+            )
+            conn.commit()
 
         return cur.rowcount > 0
 
@@ -96,18 +132,99 @@ class CategoryRepository:
     # DELETE
     # --------------------------------------------------
 
-    def delete(self, category_id: str) -> bool:
+    @write_op
+    def delete(self, category_id: str) -> Optional[CategoryDeletion]:
+        """
+        Products fall back to the default category. Those whose name is
+        already taken there are merged into that product (items and usage
+        move over, active list items are logged as delete + add). None if
+        there was no such category.
+        """
         if category_id == DEFAULT_CATEGORY_ID:
-            return False  # protect default category
+            return None  # protect default category
+
+        now = int(time.time())
+
+        with self.get_conn() as conn:
+            dupes = conn.execute(
+                """
+                SELECT p.id, k.id
+                FROM products p
+                JOIN products k ON k.name = p.name AND k.category_id = ?
+                WHERE p.category_id = ?
+                """,
+                (to_key(DEFAULT_CATEGORY_ID), to_key(category_id)),
+            ).fetchall()
+            moved = [
+                r["id"]
+                for dupe, _ in dupes
+                for r in conn.execute(
+                    """
+                    SELECT id FROM shopping_items
+                    WHERE product_id = ? AND list_id = (
+                        SELECT id FROM shopping_lists WHERE status = 'active'
+                    )
+                    """,
+                    (to_key(dupe),),
+                )
+            ]
+            self._merge_products(conn, [(to_key(d), to_key(k)) for d, k in dupes])
+
+            cur = conn.execute(
+                """
+                DELETE FROM category
+                WHERE id = ?
+                """,
+                (to_key(category_id),),
+            )
+
+            moved_items = []
+            for item_id in moved:
+                item_key = to_key(item_id)
+                row = conn.execute(VIEW_SQL + " WHERE si.id = ?", (item_key,)).fetchone()
+                list_key = to_key(row["list_id"])
+                conn.execute(
+                    LOG_CHANGE_SQL, (list_key, "delete", item_key, None, now)
+                )
+                conn.execute(
+                    LOG_CHANGE_SQL,
+                    (
+                        list_key,
+                        "add",
+                        item_key,
+                        json.dumps(dict(row), ensure_ascii=False),
+                        now,
+                    ),
+                )
+                moved_items.append(ShoppingItemView(**dict(row)))
+
+            conn.commit()
+
+        if cur.rowcount == 0:
+            return None
+        return CategoryDeletion(
+            merged_product_ids=[d for d, _ in dupes],
+            moved_items=moved_items,
+        )
 
-        conn = self.get_conn()
-        cur = conn.execute(
+    @staticmethod
+    def _merge_products(conn, dupes: List[Tuple[bytes, bytes]]) -> None:
+        # (dupe, keep) pairs, as in migration 011
+        conn.executemany(
+            "UPDATE shopping_items SET product_id = ? WHERE product_id = ?",
+            [(keep, dupe) for dupe, keep in dupes],
+        )
+        conn.executemany(
             """
-            DELETE FROM category
-            WHERE id = ?
+            INSERT INTO product_usage (product_id, score, last_used_ts)
+            SELECT ?, score, last_used_ts FROM product_usage WHERE product_id = ?
+            ON CONFLICT(product_id) DO UPDATE SET
+              score = score + excluded.score,
+              last_used_ts = MAX(last_used_ts, excluded.last_used_ts)
             """,
-            (category_id,),
+            [(keep, dupe) for dupe, keep in dupes],
         )
-        conn.commit()
-
-        return cur.rowcount > 0
\ No newline at end of file
+        conn.executemany(
+            "DELETE FROM products WHERE id = ?",
+            [(dupe,) for dupe, _ in dupes],
+        )
\ No newline at end of file
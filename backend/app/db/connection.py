@@ -1,16 +1,244 @@
+import os
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import Callable, List
 from pathlib import Path
 
+from app.db.product_usage import usage_weight
+from app.db.storage_profile import STORAGE_PROFILE, StorageProfile
+from app.db.uuid_key import to_key
+
 DB_PATH = Path("data/app.db")
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", str(POOL_SIZE)))
+POOL_TIMEOUT = 10
 
 
-def get_connection():
-    conn = sqlite3.connect(
-        DB_PATH,
-        timeout=10,
-        check_same_thread=False,
-    )
+def open_connection(
+    db_path=DB_PATH,
+    read_only: bool = False,
+    profile: StorageProfile = STORAGE_PROFILE,
+) -> sqlite3.Connection:
+    if read_only:
+        # WAL is persistent in the file: set by the read-write connections
+        conn = sqlite3.connect(
+            f"{Path(db_path).resolve().as_uri()}?mode=ro",
+            uri=True,
+            timeout=profile.busy_timeout_ms / 1000,
+            check_same_thread=False,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+        )
+        conn.execute("PRAGMA query_only = ON")
+    else:
+        conn = sqlite3.connect(
+            db_path,
+            timeout=profile.busy_timeout_ms / 1000,
+            check_same_thread=False,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+        )
+        conn.execute("PRAGMA journal_mode=WAL;")
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL;")
     conn.execute("PRAGMA foreign_keys = ON")
-    return conn
\ No newline at end of file
+    for pragma in profile.pragmas():
+        conn.execute(pragma)
+    # UUID text -> BLOB key in SQL (migrations, ad hoc queries)
+    conn.create_function("uuid_blob", 1, to_key, deterministic=True)
+    # decayed usage weight of a timestamp (migrations)
+    conn.create_function("usage_weight", 1, usage_weight, deterministic=True)
+    return conn
+
+
+class ConnectionPool:
+    """
+    Bounded pool of SQLite connections shared by all repositories.
+
+    Connections are opened lazily up to `max_size`, configured once and
+    handed back to the pool after each use instead of being re-opened
+    on every repository call.
+    """
+
+    def __init__(
+        self,
+        db_path=DB_PATH,
+        max_size: int = POOL_SIZE,
+        read_only: bool = False,
+        profile: StorageProfile = STORAGE_PROFILE,
+    ):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.read_only = read_only
+        self.profile = profile
+
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._closed = False
+
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._opened < self.max_size:
+                self._opened += 1
+                grow = True
+            else:
+                grow = False
+
+        if grow:
+            try:
+                return open_connection(self.db_path, self.read_only, self.profile)
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=POOL_TIMEOUT)
+        except queue.Empty:
+            raise RuntimeError("Timed out waiting for a database connection")
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+
+        if self._closed:
+            self._discard(conn)
+            return
+
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        except BaseException:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                self._discard(conn)
+                raise
+            self.release(conn)
+            raise
+        else:
+            self.release(conn)
+
+    def close_all(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            self._opened -= 1
+        conn.close()
+
+
+class _TransactionConnection:
+    """
+    Connection handed to repositories inside `transaction()`: their own
+    commit() calls are ignored, the transaction is committed once.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+        self.after_commit: List[Callable[[], None]] = []
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def commit(self) -> None:
+        pass
+
+
+pool = ConnectionPool()
+# mode=ro connections for repository reads: never take the write lock
+read_pool = ConnectionPool(max_size=READ_POOL_SIZE, read_only=True)
+_local = threading.local()
+
+
+def get_connection():
+    tx = getattr(_local, "tx", None)
+    if tx is not None:
+        return nullcontext(tx)
+    return pool.connection()
+
+
+def get_read_connection():
+    # inside a transaction reads share its connection (own writes, one snapshot)
+    tx = getattr(_local, "tx", None)
+    if tx is not None:
+        return nullcontext(tx)
+    return read_pool.connection()
+
+
+@contextmanager
+def transaction(read_only: bool = False):
+    """
+    Run every repository call of this thread in one transaction,
+    committed at the end (rolled back on error). Nested use joins the
+    outer transaction.
+
+    A write transaction takes the write lock up front (BEGIN IMMEDIATE);
+    `read_only` runs on a read-only connection and just pins one WAL
+    snapshot for all reads.
+    """
+    if getattr(_local, "tx", None) is not None:
+        yield _local.tx
+        return
+
+    with (read_pool if read_only else pool).connection() as conn:
+        conn.execute("BEGIN" if read_only else "BEGIN IMMEDIATE")
+        tx = _local.tx = _TransactionConnection(conn)
+        try:
+            yield tx
+            conn.commit()
+        finally:
+            _local.tx = None
+
+    for callback in tx.after_commit:
+        callback()
+
+
+@contextmanager
+def savepoint(name: str = "sp"):
+    # partial rollback inside `transaction()`, along with the after_commit
+    # callbacks registered meanwhile
+    tx = _local.tx
+    callbacks = len(tx.after_commit)
+    tx.execute(f"SAVEPOINT {name}")
+    try:
+        yield
+    except BaseException:
+        tx.execute(f"ROLLBACK TO {name}")
+        tx.execute(f"RELEASE {name}")
+        del tx.after_commit[callbacks:]
+        raise
+    tx.execute(f"RELEASE {name}")
+
+
+def in_transaction() -> bool:
+    return getattr(_local, "tx", None) is not None
+
+
+def after_commit(callback: Callable[[], None]) -> None:
+    # run now, or once the surrounding transaction() has committed
+    tx = getattr(_local, "tx", None)
+    if tx is None:
+        callback()
+    else:
+        tx.after_commit.append(callback)
+
+
+def close_connections() -> None:
+    read_pool.close_all()
+    pool.close_all()
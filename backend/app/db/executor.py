@@ -0,0 +1,75 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from app.db.connection import POOL_SIZE
+
+# requests allowed to wait for a DB thread before new ones get 503
+DB_QUEUE_DEPTH = int(os.getenv("DB_QUEUE_DEPTH", "512"))
+
+T = TypeVar("T")
+
+
+class DbOverloadedError(Exception):
+    pass
+
+
+class DbExecutor:
+    """
+    Dedicated threads for blocking database work of async routes.
+
+    One thread per pooled connection and a bounded number of waiting
+    calls; beyond that `run` fails fast with DbOverloadedError instead
+    of queueing behind the SQLite busy timeout. Waiting requests hold no
+    thread, so the number of open requests is not capped by the
+    threadpool size.
+
+    The connection pools are shared with the timer loop, retention,
+    maintenance and the streamed exports, so a running call can still
+    wait for a connection (up to POOL_TIMEOUT). Those hold one only
+    briefly: streams take a fresh one per page.
+    """
+
+    def __init__(self, workers: int = POOL_SIZE, max_queue: int = DB_QUEUE_DEPTH):
+        self.workers = workers
+        self.max_queue = max_queue
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="db",
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                raise DbOverloadedError()
+            self._pending += 1
+
+        try:
+            future = self._executor.submit(functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+
+        # released when the call really ends, not when the request is cancelled
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._pending
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+
+db_executor = DbExecutor()
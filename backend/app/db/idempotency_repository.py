@@ -0,0 +1,52 @@
+import json
+from typing import Dict, List
+
+from app.db.connection import get_connection, get_read_connection
+from app.db.write_queue import write_op
+
+
+class IdempotencyRepository:
+
+    def get_conn(self):
+        return get_connection()
+
+    def get_read_conn(self):
+        return get_read_connection()
+
+    def find(self, keys: List[str]) -> Dict[str, dict]:
+        if not keys:
+            return {}
+
+        with self.get_read_conn() as conn:
+            rows = conn.execute(
+                """
+                SELECT key, result FROM idempotency_keys
+                WHERE key IN (SELECT value FROM json_each(?))
+                """,
+                (json.dumps(keys),),
+            ).fetchall()
+
+        return {r["key"]: json.loads(r["result"]) for r in rows}
+
+    @write_op
+    def save(self, key: str, result: dict, now_ts: int) -> None:
+        with self.get_conn() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO idempotency_keys (key, result, created_at_ts)
+                VALUES (?, ?, ?)
+                """,
+                (key, json.dumps(result, ensure_ascii=False), now_ts),
+            )
+            conn.commit()
+
+    @write_op
+    def prune(self, before_ts: int) -> int:
+        with self.get_conn() as conn:
+            cur = conn.execute(
+                "DELETE FROM idempotency_keys WHERE created_at_ts < ?",
+                (before_ts,),
+            )
+            conn.commit()
+
+        return cur.rowcount
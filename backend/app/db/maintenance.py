@@ -0,0 +1,248 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Deque, List, Optional
+
+from app.db import connection
+from app.db.connection import get_connection
+from app.db.data_version import data_versions
+from app.models.views.maintenance_report import (
+    MaintenanceRun,
+    MaintenanceStatus,
+    MaintenanceStep,
+)
+
+logger = logging.getLogger(__name__)
+
+MAINTENANCE_INTERVAL_SEC = float(os.getenv("DB_MAINTENANCE_INTERVAL_SEC", "300"))
+# checkpoint TRUNCATE, optimize and vacuum wait until no write for this long
+MAINTENANCE_IDLE_SEC = float(os.getenv("DB_MAINTENANCE_IDLE_SEC", "60"))
+WAL_TRUNCATE_BYTES = 4 * 2**20
+OPTIMIZE_INTERVAL_SEC = 6 * 3600
+ANALYSIS_LIMIT = 1000        # rows sampled per index by ANALYZE
+VACUUM_MIN_FREE_PAGES = 64
+VACUUM_MAX_PAGES = 512       # per run: keeps the write lock short
+BUSY_TIMEOUT_MS = 1000       # give up rather than stall requests
+HISTORY = 20
+
+
+class DbMaintenance:
+    """
+    Periodic housekeeping of the SQLite file on its own thread, next to
+    the timer loop.
+
+    Every run checkpoints the WAL (PASSIVE: never waits for readers or
+    writers). Once no write has been committed for `idle_sec` it also
+    truncates a WAL grown past WAL_TRUNCATE_BYTES, runs PRAGMA optimize
+    every OPTIMIZE_INTERVAL_SEC (ANALYZE while there are no statistics
+    yet) and hands up to VACUUM_MAX_PAGES free pages back to the file
+    system (auto_vacuum = INCREMENTAL, migration 013). The last runs and
+    their timings are kept for GET /api/maintenance.
+    """
+
+    def __init__(
+        self,
+        interval_sec: float = MAINTENANCE_INTERVAL_SEC,
+        idle_sec: float = MAINTENANCE_IDLE_SEC,
+    ):
+        self.interval_sec = interval_sec
+        self.idle_sec = idle_sec
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._runs: Deque[MaintenanceRun] = deque(maxlen=HISTORY)
+        self._last_optimize: Optional[float] = None
+
+    # --------------------------------------------------
+    # LIFECYCLE
+    # --------------------------------------------------
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="db-maintenance",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_sec):
+            self.run_once()
+
+    # --------------------------------------------------
+    # RUN
+    # --------------------------------------------------
+
+    def run_once(self, force: bool = False) -> MaintenanceRun:
+        with self._lock:
+            idle_sec = data_versions.idle_seconds()
+            idle = force or idle_sec >= self.idle_sec
+            started_at = int(time.time())
+            start = time.perf_counter()
+            steps: List[MaintenanceStep] = []
+            error = None
+
+            try:
+                with get_connection() as conn, _busy_timeout(conn, BUSY_TIMEOUT_MS):
+                    steps.append(self._checkpoint(conn, idle, force))
+                    if idle:
+                        optimize = self._optimize(conn, force)
+                        if optimize:
+                            steps.append(optimize)
+                        vacuum = self._vacuum(conn, force)
+                        if vacuum:
+                            steps.append(vacuum)
+            except sqlite3.Error as e:
+                # busy or I/O trouble: the next run tries again
+                logger.warning("db maintenance failed: %s", e)
+                error = str(e)
+
+            run = MaintenanceRun(
+                started_at=started_at,
+                forced=force,
+                idle_sec=round(idle_sec, 1),
+                ms=_ms_since(start),
+                steps=steps,
+                error=error,
+            )
+            self._runs.appendleft(run)
+
+        logger.info(
+            "db maintenance: %s in %.1f ms",
+            ", ".join(f"{s.name} {s.ms:.1f} ms" for s in run.steps) or "nothing",
+            run.ms,
+        )
+        return run
+
+    def status(self) -> MaintenanceStatus:
+        with self._lock:
+            runs = list(self._runs)
+        return MaintenanceStatus(
+            interval_sec=self.interval_sec,
+            idle_after_sec=self.idle_sec,
+            runs=runs,
+        )
+
+    # --------------------------------------------------
+    # STEPS
+    # --------------------------------------------------
+
+    def _checkpoint(self, conn, idle: bool, force: bool) -> MaintenanceStep:
+        wal_before = _wal_bytes()
+        # TRUNCATE holds the write lock while it waits for readers
+        truncate = force or (idle and wal_before > WAL_TRUNCATE_BYTES)
+        mode = "TRUNCATE" if truncate else "PASSIVE"
+
+        start = time.perf_counter()
+        busy, log_frames, checkpointed = conn.execute(
+            f"PRAGMA wal_checkpoint({mode})"
+        ).fetchone()
+
+        return MaintenanceStep(
+            name="checkpoint",
+            ms=_ms_since(start),
+            detail=dict(
+                mode=mode,
+                busy=bool(busy),
+                wal_frames=log_frames,
+                checkpointed_frames=checkpointed,
+                wal_bytes_before=wal_before,
+                wal_bytes_after=_wal_bytes(),
+            ),
+        )
+
+    def _optimize(self, conn, force: bool) -> Optional[MaintenanceStep]:
+        now = time.monotonic()
+        if (
+            not force
+            and self._last_optimize is not None
+            and now - self._last_optimize < OPTIMIZE_INTERVAL_SEC
+        ):
+            return None
+
+        has_stats = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+        ).fetchone() and conn.execute("SELECT 1 FROM sqlite_stat1").fetchone()
+
+        start = time.perf_counter()
+        conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+        try:
+            if has_stats:
+                # 0x10000: consider every table, not only those this
+                # connection queried (SQLite 3.46+, ignored before)
+                conn.execute("PRAGMA optimize = 0x10002")
+            else:
+                conn.execute("ANALYZE")
+            conn.commit()
+        finally:
+            conn.execute("PRAGMA analysis_limit = 0")
+        self._last_optimize = now
+
+        return MaintenanceStep(
+            name="optimize" if has_stats else "analyze",
+            ms=_ms_since(start),
+            detail=dict(analysis_limit=ANALYSIS_LIMIT),
+        )
+
+    def _vacuum(self, conn, force: bool) -> Optional[MaintenanceStep]:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            return None  # NONE/FULL: nothing to do incrementally
+
+        free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if free_before == 0 or (not force and free_before < VACUUM_MIN_FREE_PAGES):
+            return None
+
+        start = time.perf_counter()
+        # executescript steps the pragma to the end (execute frees one page)
+        conn.executescript(f"PRAGMA incremental_vacuum({VACUUM_MAX_PAGES})")
+        free_after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+        return MaintenanceStep(
+            name="incremental_vacuum",
+            ms=_ms_since(start),
+            detail=dict(
+                free_pages_before=free_before,
+                free_pages_after=free_after,
+                page_count=conn.execute("PRAGMA page_count").fetchone()[0],
+            ),
+        )
+
+
+@contextmanager
+def _busy_timeout(conn, ms: int):
+    previous = conn.execute("PRAGMA busy_timeout").fetchone()[0]
+    conn.execute(f"PRAGMA busy_timeout = {ms}")
+    try:
+        yield
+    finally:
+        conn.execute(f"PRAGMA busy_timeout = {previous}")
+
+
+def _wal_bytes() -> int:
+    wal = Path(f"{connection.pool.db_path}-wal")
+    try:
+        return wal.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _ms_since(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+db_maintenance = DbMaintenance()
@@ -0,0 +1,52 @@
+-- Full-text index over product and category names.
+-- unicode61 folds case for all scripts (SQLite's LOWER() is ASCII-only);
+-- diacritics are kept so that e.g. "й" and "и" stay distinct.
+-- Rows are keyed by products.rowid and maintained by the triggers below.
+CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+  name,
+  category_name,
+  tokenize = "unicode61 remove_diacritics 0",
+  prefix = '2 3 4'
+);
+
+INSERT INTO products_fts (rowid, name, category_name)
+SELECT p.rowid, p.name, c.name
+FROM products p
+JOIN category c ON c.id = p.category_id;
+
+CREATE TRIGGER IF NOT EXISTS products_fts_ai
+AFTER INSERT ON products
+BEGIN
+  INSERT INTO products_fts (rowid, name, category_name)
+  VALUES (
+    new.rowid,
+    new.name,
+    (SELECT name FROM category WHERE id = new.category_id)
+  );
+END;
+
+CREATE TRIGGER IF NOT EXISTS products_fts_ad
+AFTER DELETE ON products
+BEGIN
+  DELETE FROM products_fts WHERE rowid = old.rowid;
+END;
+
+CREATE TRIGGER IF NOT EXISTS products_fts_au
+AFTER UPDATE OF name, category_id ON products
+BEGIN
+  DELETE FROM products_fts WHERE rowid = old.rowid;
+  INSERT INTO products_fts (rowid, name, category_name)
+  VALUES (
+    new.rowid,
+    new.name,
+    (SELECT name FROM category WHERE id = new.category_id)
+  );
+END;
+
+CREATE TRIGGER IF NOT EXISTS category_fts_au
+AFTER UPDATE OF name ON category
+BEGIN
+  UPDATE products_fts
+  SET category_name = new.name
+  WHERE rowid IN (SELECT rowid FROM products WHERE category_id = new.id);
+END;
@@ -0,0 +1,18 @@
+-- Decayed per-product usage used to rank autocomplete.
+-- score is a sum of 2^((used_at - epoch) / half_life) (see
+-- app/db/product_usage.py), so ordering by it equals ordering by an
+-- exponentially decayed use count at any point in time.
+CREATE TABLE IF NOT EXISTS product_usage (
+  product_id TEXT PRIMARY KEY,
+  score REAL NOT NULL,
+  last_used_ts INTEGER NOT NULL,
+
+  FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+-- existing history: one use per item, at the time it was added
+-- (usage_weight() is registered by app/db/connection.py)
+INSERT OR IGNORE INTO product_usage (product_id, score, last_used_ts)
+SELECT product_id, SUM(usage_weight(created_at_ts)), MAX(created_at_ts)
+FROM shopping_items
+GROUP BY product_id;
@@ -0,0 +1,9 @@
+-- Items may only be added to the active list. Workers cache the active
+-- list id; once another worker archives it, inserts fail here instead of
+-- landing in an archived list, and the worker reloads its cache.
+CREATE TRIGGER IF NOT EXISTS shopping_items_active_list
+BEFORE INSERT ON shopping_items
+WHEN (SELECT status FROM shopping_lists WHERE id = NEW.list_id) IS NOT 'active'
+BEGIN
+  SELECT RAISE(ABORT, 'shopping list is not active');
+END;
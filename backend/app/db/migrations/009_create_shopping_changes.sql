@@ -0,0 +1,12 @@
+-- Append-only log of shopping list edits for delta sync
+-- (GET /api/shopping/changes?since=<seq>).
+-- op: add (payload = item view JSON), quantity (payload = {"quantity"}),
+--     delete, clear, archive (item_id NULL)
+CREATE TABLE IF NOT EXISTS shopping_changes (
+  seq INTEGER PRIMARY KEY AUTOINCREMENT,
+  list_id TEXT NOT NULL,
+  op TEXT NOT NULL,
+  item_id TEXT,
+  payload TEXT,
+  changed_at_ts INTEGER NOT NULL
+);
@@ -0,0 +1,10 @@
+-- Results of POST /api/batch operations by client idempotency key, so a
+-- retried operation returns the stored result instead of applying twice.
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+  key TEXT PRIMARY KEY,
+  result TEXT NOT NULL,
+  created_at_ts INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_created
+ON idempotency_keys(created_at_ts);
@@ -0,0 +1,62 @@
+-- Indexes for the repository queries (checked by bench/query_plans.py).
+
+-- 002 created idx_products_name on category (name is already UNIQUE
+-- there), so 003's products index was never created.
+DROP INDEX IF EXISTS idx_products_name;
+
+-- (name, category_id) becomes unique: merge existing duplicates into the
+-- oldest row first, moving their items and usage over.
+CREATE TEMP TABLE product_dupes AS
+SELECT p.id AS dupe_id, k.id AS keep_id
+FROM (
+  SELECT name, category_id, MIN(rowid) AS keep_rowid
+  FROM products
+  GROUP BY name, category_id
+  HAVING COUNT(*) > 1
+) g
+JOIN products p ON p.name = g.name AND p.category_id = g.category_id
+JOIN products k ON k.rowid = g.keep_rowid
+WHERE p.rowid <> g.keep_rowid;
+
+UPDATE shopping_items
+SET product_id = (SELECT keep_id FROM product_dupes WHERE dupe_id = product_id)
+WHERE product_id IN (SELECT dupe_id FROM product_dupes);
+
+INSERT INTO product_usage (product_id, score, last_used_ts)
+SELECT d.keep_id, SUM(u.score), MAX(u.last_used_ts)
+FROM product_dupes d
+JOIN product_usage u ON u.product_id = d.dupe_id
+WHERE true
+GROUP BY d.keep_id
+ON CONFLICT(product_id) DO UPDATE SET
+  score = score + excluded.score,
+  last_used_ts = MAX(last_used_ts, excluded.last_used_ts);
+
+DELETE FROM products WHERE id IN (SELECT dupe_id FROM product_dupes);
+
+DROP TABLE product_dupes;
+
+-- get_by_name_category_id / get_or_create
+CREATE UNIQUE INDEX IF NOT EXISTS idx_products_name_category
+ON products(name, category_id);
+
+-- FK ON DELETE SET DEFAULT, category_fts_au, and the product listing
+-- (categories by name, then their products by name, id: no sort)
+CREATE INDEX IF NOT EXISTS idx_products_category
+ON products(category_id, name, id);
+
+-- list items in insertion order (rowid is implied)
+CREATE INDEX IF NOT EXISTS idx_shopping_items_list
+ON shopping_items(list_id, created_at_ts);
+
+-- FK check when a product is deleted
+CREATE INDEX IF NOT EXISTS idx_shopping_items_product
+ON shopping_items(product_id);
+
+-- CategoryRepository.get_by_name
+CREATE INDEX IF NOT EXISTS idx_category_name_lower
+ON category(LOWER(name));
+
+-- scheduler: running timers
+CREATE INDEX IF NOT EXISTS idx_timers_status
+ON timers(status);
@@ -0,0 +1,198 @@
+-- UUID keys as 16-byte BLOBs instead of 36-char TEXT: smaller PK, FK and
+-- index entries and memcmp-sized JOIN comparisons. The API keeps string
+-- ids; "UUID BLOB" columns are converted by app/db/uuid_key.py and
+-- uuid_blob() is registered on every connection (app/db/connection.py).
+--
+-- Tables are rebuilt (create new, copy, drop, rename); products keep
+-- their rowid, which keys products_fts. Indexes and triggers of the old
+-- tables are recreated at the end.
+PRAGMA foreign_keys = OFF;
+
+BEGIN;
+
+CREATE TABLE timers_new (
+  id UUID BLOB PRIMARY KEY,
+  name TEXT NOT NULL,
+  duration_sec INTEGER NOT NULL,
+  remaining_sec INTEGER NOT NULL,
+  status TEXT NOT NULL,
+  started_at INTEGER
+);
+
+CREATE TABLE category_new (
+  id UUID BLOB PRIMARY KEY,
+  name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE products_new (
+  id UUID BLOB PRIMARY KEY,
+  name TEXT NOT NULL,
+  category_id UUID BLOB NOT NULL
+      DEFAULT X'00000000000000000000000000000000',
+
+  FOREIGN KEY (category_id)
+    REFERENCES category(id)
+    ON DELETE SET DEFAULT
+);
+
+CREATE TABLE shopping_lists_new (
+  id UUID BLOB PRIMARY KEY,
+  status TEXT NOT NULL,
+  created_at_ts INTEGER NOT NULL,
+  external_ref TEXT
+);
+
+CREATE TABLE shopping_items_new (
+  id UUID BLOB PRIMARY KEY,
+  list_id UUID BLOB NOT NULL,
+  product_id UUID BLOB NOT NULL,
+  created_at_ts INTEGER NOT NULL,
+  quantity TEXT NOT NULL DEFAULT '1',
+
+  FOREIGN KEY(list_id) REFERENCES shopping_lists(id) ON DELETE CASCADE,
+  FOREIGN KEY(product_id) REFERENCES products(id)
+);
+
+CREATE TABLE product_usage_new (
+  product_id UUID BLOB PRIMARY KEY,
+  score REAL NOT NULL,
+  last_used_ts INTEGER NOT NULL,
+
+  FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+CREATE TABLE shopping_changes_new (
+  seq INTEGER PRIMARY KEY AUTOINCREMENT,
+  list_id UUID BLOB NOT NULL,
+  op TEXT NOT NULL,
+  item_id UUID BLOB,
+  payload TEXT,
+  changed_at_ts INTEGER NOT NULL
+);
+
+INSERT INTO timers_new
+SELECT uuid_blob(id), name, duration_sec, remaining_sec, status, started_at
+FROM timers;
+
+INSERT INTO category_new
+SELECT uuid_blob(id), name FROM category;
+
+INSERT INTO products_new (rowid, id, name, category_id)
+SELECT rowid, uuid_blob(id), name, uuid_blob(category_id) FROM products;
+
+INSERT INTO shopping_lists_new
+SELECT uuid_blob(id), status, created_at_ts, external_ref FROM shopping_lists;
+
+INSERT INTO shopping_items_new (rowid, id, list_id, product_id, created_at_ts, quantity)
+SELECT rowid, uuid_blob(id), uuid_blob(list_id), uuid_blob(product_id),
+       created_at_ts, quantity
+FROM shopping_items;
+
+INSERT INTO product_usage_new
+SELECT uuid_blob(product_id), score, last_used_ts FROM product_usage;
+
+INSERT INTO shopping_changes_new
+SELECT seq, uuid_blob(list_id), op, uuid_blob(item_id), payload, changed_at_ts
+FROM shopping_changes;
+
+-- the change feed cursor must not move back when the log was pruned
+UPDATE sqlite_sequence
+SET seq = COALESCE(
+  (SELECT seq FROM sqlite_sequence WHERE name = 'shopping_changes'), seq
+)
+WHERE name = 'shopping_changes_new';
+
+INSERT INTO sqlite_sequence (name, seq)
+SELECT 'shopping_changes_new', seq FROM sqlite_sequence
+WHERE name = 'shopping_changes'
+  AND NOT EXISTS (
+    SELECT 1 FROM sqlite_sequence WHERE name = 'shopping_changes_new'
+  );
+
+DROP TABLE timers;
+DROP TABLE category;
+DROP TABLE products;
+DROP TABLE shopping_lists;
+DROP TABLE shopping_items;
+DROP TABLE product_usage;
+DROP TABLE shopping_changes;
+
+ALTER TABLE timers_new RENAME TO timers;
+ALTER TABLE category_new RENAME TO category;
+ALTER TABLE products_new RENAME TO products;
+ALTER TABLE shopping_lists_new RENAME TO shopping_lists;
+ALTER TABLE shopping_items_new RENAME TO shopping_items;
+ALTER TABLE product_usage_new RENAME TO product_usage;
+ALTER TABLE shopping_changes_new RENAME TO shopping_changes;
+
+-- 005, 011
+CREATE UNIQUE INDEX idx_one_active_list
+ON shopping_lists(status)
+WHERE status = 'active';
+
+CREATE UNIQUE INDEX idx_products_name_category
+ON products(name, category_id);
+
+CREATE INDEX idx_products_category
+ON products(category_id, name, id);
+
+CREATE INDEX idx_shopping_items_list
+ON shopping_items(list_id, created_at_ts);
+
+CREATE INDEX idx_shopping_items_product
+ON shopping_items(product_id);
+
+CREATE INDEX idx_category_name_lower
+ON category(LOWER(name));
+
+CREATE INDEX idx_timers_status
+ON timers(status);
+
+-- 006, 008
+CREATE TRIGGER products_fts_ai
+AFTER INSERT ON products
+BEGIN
+  INSERT INTO products_fts (rowid, name, category_name)
+  VALUES (
+    new.rowid,
+    new.name,
+    (SELECT name FROM category WHERE id = new.category_id)
+  );
+END;
+
+CREATE TRIGGER products_fts_ad
+AFTER DELETE ON products
+BEGIN
+  DELETE FROM products_fts WHERE rowid = old.rowid;
+END;
+
+CREATE TRIGGER products_fts_au
+AFTER UPDATE OF name, category_id ON products
+BEGIN
+  DELETE FROM products_fts WHERE rowid = old.rowid;
+  INSERT INTO products_fts (rowid, name, category_name)
+  VALUES (
+    new.rowid,
+    new.name,
+    (SELECT name FROM category WHERE id = new.category_id)
+  );
+END;
+
+CREATE TRIGGER category_fts_au
+AFTER UPDATE OF name ON category
+BEGIN
+  UPDATE products_fts
+  SET category_name = new.name
+  WHERE rowid IN (SELECT rowid FROM products WHERE category_id = new.id);
+END;
+
+CREATE TRIGGER shopping_items_active_list
+BEFORE INSERT ON shopping_items
+WHEN (SELECT status FROM shopping_lists WHERE id = NEW.list_id) IS NOT 'active'
+BEGIN
+  SELECT RAISE(ABORT, 'shopping list is not active');
+END;
+
+COMMIT;
+
+PRAGMA foreign_keys = ON;
@@ -0,0 +1,15 @@
+-- Free pages are handed back in small steps by the maintenance task
+-- (PRAGMA incremental_vacuum, app/db/maintenance.py). An existing DB only
+-- switches auto_vacuum mode through one full VACUUM.
+PRAGMA auto_vacuum = INCREMENTAL;
+
+VACUUM;
+
+-- VACUUM may renumber rowids of tables without an INTEGER PRIMARY KEY
+-- (SQLite keeps them in practice); products_fts is keyed by them
+DELETE FROM products_fts;
+
+INSERT INTO products_fts (rowid, name, category_name)
+SELECT p.rowid, p.name, c.name
+FROM products p
+JOIN category c ON c.id = p.category_id;
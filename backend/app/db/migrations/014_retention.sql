@@ -0,0 +1,46 @@
+-- Retention (app/services/retention_service.py): finished timers are
+-- deleted after a while, archived lists lose their items to a summary.
+
+ALTER TABLE timers ADD COLUMN finished_at INTEGER;
+
+-- best guess for timers finished before this column existed
+UPDATE timers
+SET finished_at = COALESCE(
+  started_at + duration_sec,
+  CAST(strftime('%s', 'now') AS INTEGER)
+)
+WHERE status = 'finished';
+
+DROP INDEX IF EXISTS idx_timers_status;
+
+-- scheduler: running timers; sweeper: finished ones by age
+CREATE INDEX idx_timers_status
+ON timers(status, finished_at);
+
+ALTER TABLE shopping_lists ADD COLUMN archived_at_ts INTEGER;
+
+UPDATE shopping_lists
+SET archived_at_ts = COALESCE(
+  (SELECT MAX(changed_at_ts) FROM shopping_changes c
+   WHERE c.list_id = shopping_lists.id AND c.op = 'archive'),
+  created_at_ts
+)
+WHERE status = 'archived';
+
+CREATE INDEX idx_shopping_lists_archived
+ON shopping_lists(status, archived_at_ts);
+
+-- what an archived list contained once its shopping_items are gone:
+-- items = JSON [[name, category, quantity], ...] in list order
+CREATE TABLE shopping_list_summaries (
+  list_id UUID BLOB PRIMARY KEY,
+  item_count INTEGER NOT NULL,
+  items TEXT NOT NULL,
+  compacted_at_ts INTEGER NOT NULL,
+
+  FOREIGN KEY (list_id) REFERENCES shopping_lists(id) ON DELETE CASCADE
+);
+
+-- a compacted list's entries leave the change log with its items
+CREATE INDEX idx_shopping_changes_list
+ON shopping_changes(list_id);
@@ -0,0 +1,101 @@
+-- Per-table change counters for ETags (app/db/data_version.py).
+-- Kept by triggers, so every writer bumps them (other workers, scripts,
+-- the sqlite3 shell) and a rolled back write rolls its bump back too.
+CREATE TABLE IF NOT EXISTS data_version (
+  name TEXT PRIMARY KEY,
+  version INTEGER NOT NULL
+) WITHOUT ROWID;
+
+INSERT OR IGNORE INTO data_version (name, version)
+VALUES ('category', 0), ('products', 0), ('shopping_lists', 0),
+       ('shopping_items', 0), ('timers', 0);
+
+CREATE TRIGGER IF NOT EXISTS data_version_category_insert
+AFTER INSERT ON category
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE name = 'category';
+END;
+
+CREATE TRIGGER IF NOT EXISTS data_version_category_update
+AFTER UPDATE ON category
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE name = 'category';
+END;
+
+CREATE TRIGGER IF NOT EXISTS data_version_category_delete
+AFTER DELETE ON category
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE name = 'category';
+END;
+
+CREATE TRIGGER IF NOT EXISTS data_version_products_insert
+AFTER INSERT ON products
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE name = 'products';
+END;
+
+CREATE TRIGGER IF NOT EXISTS data_version_products_update
+AFTER UPDATE ON products
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE name = 'products';
+END;
+
+CREATE TRIGGER IF NOT EXISTS data_version_products_delete
+AFTER DELETE ON products
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE name = 'products';
+END;
+
+CREATE TRIGGER IF NOT EXISTS data_version_shopping_lists_insert
+AFTER INSERT ON shopping_lists
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE name = 'shopping_lists';
+END;
+
+CREATE TRIGGER IF NOT EXISTS data_version_shopping_lists_update
+AFTER UPDATE ON shopping_lists
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE name = 'shopping_lists';
+END;
+
+CREATE TRIGGER IF NOT EXISTS data_version_shopping_lists_delete
+AFTER DELETE ON shopping_lists
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE name = 'shopping_lists';
+END;
+
+CREATE TRIGGER IF NOT EXISTS data_version_shopping_items_insert
+AFTER INSERT ON shopping_items
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE name = 'shopping_items';
+END;
+
+CREATE TRIGGER IF NOT EXISTS data_version_shopping_items_update
+AFTER UPDATE ON shopping_items
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE name = 'shopping_items';
+END;
+
+CREATE TRIGGER IF NOT EXISTS data_version_shopping_items_delete
+AFTER DELETE ON shopping_items
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE name = 'shopping_items';
+END;
+
+CREATE TRIGGER IF NOT EXISTS data_version_timers_insert
+AFTER INSERT ON timers
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE name = 'timers';
+END;
+
+CREATE TRIGGER IF NOT EXISTS data_version_timers_update
+AFTER UPDATE ON timers
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE name = 'timers';
+END;
+
+CREATE TRIGGER IF NOT EXISTS data_version_timers_delete
+AFTER DELETE ON timers
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE name = 'timers';
+END;
@@ -1,29 +1,45 @@
+import re
+import sqlite3
 import uuid
-from typing import Optional, List
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, List, Tuple
 
-from app.db.connection import get_connection
+from app.db.connection import get_connection, get_read_connection
+from app.db.uuid_key import to_key
+from app.db.write_queue import write_op
+from app.models.category import Category
 from app.models.product import Product
 from app.models.views.product_view import ProductView
 
+# (category_name, name, id) – sort key of the product listing
+ProductKey = Tuple[str, str, str]
+
+
+class DuplicateProductError(ValueError):
+    """Name already taken in the category (unique since migration 011)."""
+
 
 class ProductRepository:
 
     def get_conn(self):
         return get_connection()
 
+    def get_read_conn(self):
+        return get_read_connection()
+
     # --------------------------------------------------
     # READ (ENTITY)
     # --------------------------------------------------
 
     def get_by_id(self, product_id: str) -> Optional[Product]:
-        conn = self.get_conn()
-        row = conn.execute(
-            """
-            SELECT * FROM products
-            WHERE id = ?
-            """,
-            (product_id,),
-        ).fetchone()
+        with self.get_read_conn() as conn:
+            row = conn.execute(
+                """
+                SELECT * FROM products
+                WHERE id = ?
+                """,
+                (to_key(product_id),),
+            ).fetchone()
 
         return Product(**dict(row)) if row else None
 
@@ -33,44 +49,101 @@ class ProductRepository:
         category_id: str,
     ) -> Optional[Product]:
 
-        conn = self.get_conn()
-        row = conn.execute(
-            """
-            SELECT *
-            FROM products
-            WHERE name = ? AND category_id = ?
-            """,
-            (name, category_id),
-        ).fetchone()
+        with self.get_read_conn() as conn:
+            row = conn.execute(
+                """
+                SELECT *
+                FROM products
+                WHERE name = ? AND category_id = ?
+                """,
+                (name, to_key(category_id)),
+            ).fetchone()
 
         return Product(**dict(row)) if row else None
 
+    def list_all(self) -> List[Product]:
+        with self.get_read_conn() as conn:
+            rows = conn.execute(
+                """
+                SELECT * FROM products
+                """
+            ).fetchall()
+
+        return [Product(**dict(r)) for r in rows]
+
+    def list_usage(self) -> Dict[str, float]:
+        with self.get_read_conn() as conn:
+            rows = conn.execute(
+                """
+                SELECT product_id, score FROM product_usage
+                """
+            ).fetchall()
+
+        return {r["product_id"]: r["score"] for r in rows}
+
     # --------------------------------------------------
     # READ (VIEW with JOIN)
     # --------------------------------------------------
 
     def get_view_by_id(self, product_id: str) -> Optional[ProductView]:
-        conn = self.get_conn()
-        row = conn.execute(
-            """
-            SELECT
-                p.id,
-                p.name,
-                p.category_id,
-                c.name AS category_name
-            FROM products p
-            JOIN category c ON c.id = p.category_id
-            WHERE p.id = ?
-            """,
-            (product_id,),
-        ).fetchone()
+        with self.get_read_conn() as conn:
+            row = conn.execute(
+                """
+                SELECT
+                    p.id,
+                    p.name,
+                    p.category_id,
+                    c.name AS category_name
+                FROM products p
+                JOIN category c ON c.id = p.category_id
+                WHERE p.id = ?
+                """,
+                (to_key(product_id),),
+            ).fetchone()
 
         return ProductView(**dict(row)) if row else None
 
-    def list_all_views(self, limit: int = 200) -> List[ProductView]:
-        conn = self.get_conn()
-        rows = conn.execute(
-            """
+    def list_all_views(
+        self,
+        limit: int = 200,
+        after: Optional[ProductKey] = None,
+    ) -> List[ProductView]:
+
+        sql, params = self._views_after(after)
+
+        with self.get_read_conn() as conn:
+            rows = conn.execute(sql + " LIMIT ?", (*params, limit)).fetchall()
+
+        return [ProductView(**dict(r)) for r in rows]
+
+    def iter_view_rows(
+        self,
+        after: Optional[ProductKey] = None,
+        batch_size: int = 500,
+    ) -> Iterator[dict]:
+
+        # one keyset page per pooled connection: a slow client must not
+        # hold a connection for the whole response (pages may come from
+        # different snapshots; rows are neither repeated nor skipped)
+        while True:
+            sql, params = self._views_after(after)
+            with self.get_read_conn() as conn:
+                rows = conn.execute(sql + " LIMIT ?", (*params, batch_size)).fetchall()
+
+            for r in rows:
+                yield dict(r)
+            if len(rows) < batch_size:
+                return
+
+            last = rows[-1]
+            after = (last["category_name"], last["name"], last["id"])
+
+    @staticmethod
+    def _views_after(after: Optional[ProductKey]) -> Tuple[str, tuple]:
+        # keyset pagination on (category_name, name, id)
+        where = "WHERE (c.name, p.name, p.id) > (?, ?, ?)" if after else ""
+
+        sql = f"""
             SELECT
                 p.id,
                 p.name,
@@ -78,18 +151,19 @@ class ProductRepository:
                 c.name AS category_name
             FROM products p
             JOIN category c ON c.id = p.category_id
-            ORDER BY c.name ASC, p.name ASC
-            LIMIT ?
-            """,
-            (limit,),
-        ).fetchall()
-
-        return [ProductView(**dict(r)) for r in rows]
+            {where}
+            ORDER BY c.name ASC, p.name ASC, p.id ASC
+        """
+        if not after:
+            return sql, ()
+        category_name, name, product_id = after
+        return sql, (category_name, name, to_key(product_id))
 
     # --------------------------------------------------
     # CREATE
     # --------------------------------------------------
 
+    @write_op
     def create(
         self,
         name: str,
@@ -98,15 +172,16 @@ class ProductRepository:
 
         product_id = str(uuid.uuid4())
 
-        conn = self.get_conn()
-        conn.execute(
-            """
-            INSERT INTO products (id, name, category_id)
-            VALUES (?, ?, ?)
-            """,
-            (product_id, name, category_id),
-        )
-        conn.commit()
+        with self.get_conn() as conn:
+            with _unique_name_guard():
+                conn.execute(
+                    """
+                    INSERT INTO products (id, name, category_id)
+                    VALUES (?, ?, ?)
+                    """,
+                    (to_key(product_id), name, to_key(category_id)),
+                )
+            conn.commit()
 
         return Product(
             id=product_id,
@@ -114,6 +189,7 @@ class ProductRepository:
             category_id=category_id,
         )
 
+    @write_op
     def get_or_create(
         self,
         name: str,
@@ -124,12 +200,69 @@ class ProductRepository:
         if existing:
             return existing
 
-        return self.create(name, category_id)
+        try:
+            return self.create(name, category_id)
+        except DuplicateProductError:
+            # created meanwhile by another worker
+            return self.get_by_name_category_id(name, category_id)
+
+    @write_op
+    def bulk_create(
+        self,
+        rows: List[Tuple[str, str]],
+    ) -> Tuple[List[Product], List[Category]]:
+
+        # one transaction: categories resolved once (case-insensitive) and
+        # created as needed, existing (name, category) pairs skipped
+        with self.get_conn() as conn:
+            categories = {
+                r["name"].casefold(): Category(**dict(r))
+                for r in conn.execute("SELECT id, name FROM category")
+            }
+            existing = {
+                (r["name"], r["category_id"])
+                for r in conn.execute("SELECT name, category_id FROM products")
+            }
+
+            new_categories: List[Category] = []
+            products: List[Product] = []
+
+            for name, category_name in rows:
+                category = categories.get(category_name.casefold())
+                if not category:
+                    category = Category(id=str(uuid.uuid4()), name=category_name)
+                    categories[category_name.casefold()] = category
+                    new_categories.append(category)
+
+                if (name, category.id) in existing:
+                    continue
+                existing.add((name, category.id))
+
+                products.append(
+                    Product(
+                        id=str(uuid.uuid4()),
+                        name=name,
+                        category_id=category.id,
+                    )
+                )
+
+            conn.executemany(
+                "INSERT INTO category (id, name) VALUES (?, ?)",
+                [(to_key(c.id), c.name) for c in new_categories],
+            )
+            conn.executemany(
+                "INSERT INTO products (id, name, category_id) VALUES (?, ?, ?)",
+                [(to_key(p.id), p.name, to_key(p.category_id)) for p in products],
+            )
+            conn.commit()
+
+        return products, new_categories
 
     # --------------------------------------------------
     # UPDATE
     # --------------------------------------------------
 
+    @write_op
     def update(
         self,
         product_id: str,
@@ -146,16 +279,17 @@ class ProductRepository:
             category_id if category_id is not None else existing.category_id
         )
 
-        conn = self.get_conn()
-        conn.execute(
-            """
-            UPDATE products
-            SET name = ?, category_id = ?
-            WHERE id = ?
-            """,
-            (new_name, new_category_id, product_id),
-        )
-        conn.commit()
+        with self.get_conn() as conn:
+            with _unique_name_guard():
+                conn.execute(
+                    """
+                    UPDATE products
+                    SET name = ?, category_id = ?
+                    WHERE id = ?
+                    """,
+                    (new_name, to_key(new_category_id), to_key(product_id)),
+                )
+            conn.commit()
 
         return Product(
             id=product_id,
@@ -167,16 +301,17 @@ class ProductRepository:
     # DELETE
     # --------------------------------------------------
 
+    @write_op
     def delete(self, product_id: str) -> bool:
-        conn = self.get_conn()
-        cur = conn.execute(
-            """
-            DELETE FROM products
-            WHERE id = ?
-            """,
-            (product_id,),
-        )
-        conn.commit()
+        with self.get_conn() as conn:
+            cur = conn.execute(
+                """
+                DELETE FROM products
+                WHERE id = ?
+                """,
+                (to_key(product_id),),
+            )
+            conn.commit()
 
         return cur.rowcount > 0
 
@@ -190,23 +325,48 @@ class ProductRepository:
         limit: int = 10,
     ) -> List[ProductView]:
 
-        q = f"%{query.lower()}%"
+        match = fts_prefix_query(query)
+        if not match:
+            return []
+
+        with self.get_read_conn() as conn:
+            rows = conn.execute(
+                """
+                SELECT
+                    p.id,
+                    p.name,
+                    p.category_id,
+                    c.name AS category_name
+                FROM products_fts f
+                JOIN products p ON p.rowid = f.rowid
+                JOIN category c ON c.id = p.category_id
+                LEFT JOIN product_usage u ON u.product_id = p.id
+                WHERE products_fts MATCH ?
+                ORDER BY
+                    COALESCE(u.score, 0) DESC,
+                    bm25(products_fts, 10.0, 1.0),
+                    p.name ASC
+                LIMIT ?
+                """,
+                (match, limit),
+            ).fetchall()
 
-        conn = self.get_conn()
-        rows = conn.execute(
-            """
-            SELECT
-                p.id,
-                p.name,
-                p.category_id,
-                c.name AS category_name
-            FROM products p
-            JOIN category c ON c.id = p.category_id
-            WHERE LOWER(p.name) LIKE ?
-            ORDER BY p.name ASC
-            LIMIT ?
-            """,
-            (q, limit),
-        ).fetchall()
-
-        return [ProductView(**dict(r)) for r in rows]
\ No newline at end of file
+        return [ProductView(**dict(r)) for r in rows]
+
+
+def fts_prefix_query(query: str) -> str:
+    # every word must prefix-match a token of the name or category name
+    tokens = re.findall(r"\w+", query or "")
+    return " ".join(f'"{t}"*' for t in tokens)
+
+
+@contextmanager
+def _unique_name_guard():
+    try:
+        yield
+    except sqlite3.IntegrityError as e:
+        if "products.name" in str(e):
+            raise DuplicateProductError(
+                "Product already exists in this category"
+            ) from e
+        raise
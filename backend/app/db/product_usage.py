@@ -0,0 +1,20 @@
+# Exponentially decayed usage counter for products.
+#
+# Instead of decaying every row over time, each use adds a weight that
+# grows by 2x every HALF_LIFE_SEC. Comparing the sums gives the same
+# order as comparing decayed counts, and a bump is a single UPSERT.
+
+HALF_LIFE_SEC = 14 * 24 * 3600  # weights stay within float range until ~2060
+EPOCH_TS = 1704067200  # 2024-01-01 UTC
+
+BUMP_USAGE_SQL = """
+    INSERT INTO product_usage (product_id, score, last_used_ts)
+    VALUES (?, ?, ?)
+    ON CONFLICT(product_id) DO UPDATE SET
+        score = score + excluded.score,
+        last_used_ts = excluded.last_used_ts
+"""
+
+
+def usage_weight(ts: int) -> float:
+    return 2.0 ** ((ts - EPOCH_TS) / HALF_LIFE_SEC)
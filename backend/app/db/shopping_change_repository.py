@@ -0,0 +1,63 @@
+from typing import List, Tuple
+
+from app.db.connection import get_connection, get_read_connection
+
+# executed by the item / list repositories in their own transaction
+LOG_CHANGE_SQL = """
+    INSERT INTO shopping_changes (list_id, op, item_id, payload, changed_at_ts)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+# same, for an existing item (list_id looked up); params: op, payload, ts, item_id
+LOG_ITEM_CHANGE_SQL = """
+    INSERT INTO shopping_changes (list_id, op, item_id, payload, changed_at_ts)
+    SELECT list_id, ?, id, ?, ? FROM shopping_items WHERE id = ?
+"""
+
+
+class ShoppingChangeRepository:
+
+    def get_conn(self):
+        return get_connection()
+
+    def get_read_conn(self):
+        return get_read_connection()
+
+    def list_since(self, since: int, limit: int = 500) -> List[dict]:
+        with self.get_read_conn() as conn:
+            rows = conn.execute(
+                """
+                SELECT seq, list_id, op, item_id, payload, changed_at_ts
+                FROM shopping_changes
+                WHERE seq > ?
+                ORDER BY seq ASC
+                LIMIT ?
+                """,
+                (since, limit),
+            ).fetchall()
+
+        return [dict(r) for r in rows]
+
+    def latest_seq(self) -> int:
+        # AUTOINCREMENT counter: stays put when old changes are pruned
+        with self.get_read_conn() as conn:
+            row = conn.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'shopping_changes'"
+            ).fetchone()
+
+        return row[0] if row else 0
+
+    def seq_range(self) -> Tuple[int, int]:
+        # (oldest retained, latest); oldest = latest + 1 when the log is empty
+        with self.get_read_conn() as conn:
+            row = conn.execute(
+                """
+                SELECT
+                    (SELECT MIN(seq) FROM shopping_changes),
+                    (SELECT seq FROM sqlite_sequence
+                     WHERE name = 'shopping_changes')
+                """
+            ).fetchone()
+
+        latest = row[1] or 0
+        return row[0] or latest + 1, latest
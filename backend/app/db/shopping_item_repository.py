@@ -1,44 +1,86 @@
+import json
+import sqlite3
 import time
 import uuid
-from typing import List
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterable, List
 
-from app.db.connection import get_connection
-from app.models.shopping_item import ShoppingItem
+from app.db.connection import get_connection, get_read_connection
+from app.db.product_usage import BUMP_USAGE_SQL, usage_weight
+from app.db.shopping_change_repository import LOG_CHANGE_SQL, LOG_ITEM_CHANGE_SQL
+from app.db.uuid_key import to_key
+from app.db.write_queue import write_op
+from app.models.category import Category
 from app.models.views.shopping_item_view import ShoppingItemView
 from app.models.product import Product
 
+VIEW_SQL = """
+    SELECT
+        si.id,
+        si.list_id,
+        si.product_id,
+        si.created_at_ts,
+        si.quantity,
+        p.name,
+        p.category_id,
+        c.name AS category
+    FROM shopping_items si
+    JOIN products p ON p.id = si.product_id
+    JOIN category c ON c.id = p.category_id
+"""
+
+
+class InactiveListError(Exception):
+    """Insert into a list that is no longer active (see migration 008)."""
+
+
+@dataclass
+class AddedItems:
+    items: List[ShoppingItemView]
+    # the given new products / categories, with the ids of the rows
+    # another writer may have inserted first
+    products: List[Product]
+    categories: List[Category]
+
 
 class ShoppingItemRepository:
 
     def get_conn(self):
         return get_connection()
 
+    def get_read_conn(self):
+        return get_read_connection()
+
     # --------------------------------------------------
     # LIST (VIEW with JOIN)
     # --------------------------------------------------
 
     def list_view_by_list_id(self, list_id: str) -> List[ShoppingItemView]:
-        conn = self.get_conn()
-
-        rows = conn.execute(
-            """
-            SELECT
-                si.id,
-                si.list_id,
-                si.product_id,
-                si.created_at_ts,
-                si.quantity,
-                p.name,
-                p.category_id,
-                c.name AS category_name
-            FROM shopping_items si
-            JOIN products p ON p.id = si.product_id
-            JOIN category c ON c.id = p.category_id
-            WHERE si.list_id = ?
-            ORDER BY si.created_at_ts ASC
-            """,
-            (list_id,),
-        ).fetchall()
+        with self.get_read_conn() as conn:
+            rows = conn.execute(
+                VIEW_SQL
+                + """
+                WHERE si.list_id = ?
+                ORDER BY si.created_at_ts ASC, si.rowid ASC
+                """,
+                (to_key(list_id),),
+            ).fetchall()
+
+        return [ShoppingItemView(**dict(r)) for r in rows]
+
+    def list_active_views(self) -> List[ShoppingItemView]:
+        # resolves the active list in the same statement
+        with self.get_read_conn() as conn:
+            rows = conn.execute(
+                VIEW_SQL
+                + """
+                WHERE si.list_id = (
+                    SELECT id FROM shopping_lists WHERE status = 'active'
+                )
+                ORDER BY si.created_at_ts ASC, si.rowid ASC
+                """
+            ).fetchall()
 
         return [ShoppingItemView(**dict(r)) for r in rows]
 
@@ -46,79 +88,223 @@ class ShoppingItemRepository:
     # CREATE
     # --------------------------------------------------
 
+    @write_op
     def add(
         self,
         list_id: str,
         product: Product,
         quantity: str = "1",
-    ) -> ShoppingItem:
+    ) -> ShoppingItemView:
 
         item_id = str(uuid.uuid4())
+        item_key, list_key = to_key(item_id), to_key(list_id)
         now = int(time.time())
 
-        conn = self._get_conn()
-
-        conn.execute(
-            """
-            INSERT INTO shopping_items
-                (id, list_id, product_id, created_at_ts, quantity)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (
-                item_id,
-                list_id,
-                product.id,
-                now,
-                quantity,
-            ),
-        )
-        conn.commit()
-
-        return ShoppingItem(
-            id=item_id,
-            list_id=list_id,
-            product_id=product.id,
-            created_at_ts=now,
-            quantity=quantity,
+        with self.get_conn() as conn:
+            with _active_list_guard():
+                conn.execute(
+                    """
+                    INSERT INTO shopping_items
+                        (id, list_id, product_id, created_at_ts, quantity)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (
+                        item_key,
+                        list_key,
+                        to_key(product.id),
+                        now,
+                        quantity,
+                    ),
+                )
+            conn.execute(
+                BUMP_USAGE_SQL,
+                (to_key(product.id), usage_weight(now), now),
+            )
+            # joined view of just the new row
+            row = conn.execute(VIEW_SQL + " WHERE si.id = ?", (item_key,)).fetchone()
+            conn.execute(
+                LOG_CHANGE_SQL,
+                (list_key, "add", item_key, _payload(row), now),
+            )
+            conn.commit()
+
+        return ShoppingItemView(**dict(row))
+
+    @write_op
+    def add_many(
+        self,
+        list_id: str,
+        products: List[Product],
+        new_products: Iterable[Product] = (),
+        new_categories: Iterable[Category] = (),
+        quantity: str = "1",
+    ) -> AddedItems:
+
+        # one transaction: missing categories / products first, then one
+        # item per entry of `products` (same order)
+        item_ids = [str(uuid.uuid4()) for _ in products]
+        list_key = to_key(list_id)
+        now = int(time.time())
+
+        with self.get_conn() as conn:
+            # "new" means unknown to this process: another writer may have
+            # inserted the same name meanwhile, its row is used then
+            conn.executemany(
+                "INSERT INTO category (id, name) VALUES (?, ?) ON CONFLICT DO NOTHING",
+                [(to_key(c.id), c.name) for c in new_categories],
+            )
+            category_ids: Dict[str, str] = {}
+            for c in new_categories:
+                row = conn.execute(
+                    "SELECT id FROM category WHERE name = ?", (c.name,)
+                ).fetchone()
+                category_ids[c.id] = row["id"]
+            new_categories = [
+                Category(id=category_ids[c.id], name=c.name) for c in new_categories
+            ]
+
+            new_products = [
+                Product(
+                    id=p.id,
+                    name=p.name,
+                    category_id=category_ids.get(p.category_id, p.category_id),
+                )
+                for p in new_products
+            ]
+            conn.executemany(
+                """
+                INSERT INTO products (id, name, category_id) VALUES (?, ?, ?)
+                ON CONFLICT DO NOTHING
+                """,
+                [(to_key(p.id), p.name, to_key(p.category_id)) for p in new_products],
+            )
+            product_ids: Dict[str, str] = {}
+            for p in new_products:
+                row = conn.execute(
+                    "SELECT id FROM products WHERE name = ? AND category_id = ?",
+                    (p.name, to_key(p.category_id)),
+                ).fetchone()
+                product_ids[p.id] = row["id"]
+            new_products = [
+                Product(id=product_ids[p.id], name=p.name, category_id=p.category_id)
+                for p in new_products
+            ]
+            with _active_list_guard():
+                conn.executemany(
+                    """
+                    INSERT INTO shopping_items
+                        (id, list_id, product_id, created_at_ts, quantity)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    [
+                        (
+                            to_key(item_id),
+                            list_key,
+                            to_key(product_ids.get(p.id, p.id)),
+                            now,
+                            quantity,
+                        )
+                        for item_id, p in zip(item_ids, products)
+                    ],
+                )
+            conn.executemany(
+                BUMP_USAGE_SQL,
+                [
+                    (to_key(product_ids.get(p.id, p.id)), usage_weight(now), now)
+                    for p in products
+                ],
+            )
+            rows = conn.execute(
+                VIEW_SQL
+                + " WHERE si.id IN (SELECT uuid_blob(value) FROM json_each(?))",
+                (json.dumps(item_ids),),
+            ).fetchall()
+            rows = {r["id"]: r for r in rows}
+            conn.executemany(
+                LOG_CHANGE_SQL,
+                [
+                    (list_key, "add", to_key(item_id), _payload(rows[item_id]), now)
+                    for item_id in item_ids
+                ],
+            )
+            conn.commit()
+
+        return AddedItems(
+            items=[ShoppingItemView(**dict(rows[item_id])) for item_id in item_ids],
+            products=new_products,
+            categories=new_categories,
         )
 
     # --------------------------------------------------
     # CLEAR LIST
     # --------------------------------------------------
 
+    @write_op
     def clear(self, list_id: str) -> None:
-        conn = self._get_conn()
-
-        conn.execute(
-            "DELETE FROM shopping_items WHERE list_id = ?",
-            (list_id,),
-        )
-        conn.commit()
+        with self.get_conn() as conn:
+            conn.execute(
+                "DELETE FROM shopping_items WHERE list_id = ?",
+                (to_key(list_id),),
+            )
+            conn.execute(
+                LOG_CHANGE_SQL,
+                (to_key(list_id), "clear", None, None, int(time.time())),
+            )
+            conn.commit()
 
     # --------------------------------------------------
     # UPDATE QUANTITY
     # --------------------------------------------------
 
+    @write_op
     def update_quantity(self, item_id: str, quantity: str) -> None:
-        conn = self._get_conn()
-        conn.execute(
-            """
-            UPDATE shopping_items
-            SET quantity = ?
-            WHERE id = ?
-            """,
-            (quantity, item_id),
-        )
-        conn.commit()
+        with self.get_conn() as conn:
+            conn.execute(
+                """
+                UPDATE shopping_items
+                SET quantity = ?
+                WHERE id = ?
+                """,
+                (quantity, to_key(item_id)),
+            )
+            conn.execute(
+                LOG_ITEM_CHANGE_SQL,
+                (
+                    "quantity",
+                    json.dumps({"quantity": quantity}, ensure_ascii=False),
+                    int(time.time()),
+                    to_key(item_id),
+                ),
+            )
+            conn.commit()
 
     # --------------------------------------------------
     # DELETE
     # --------------------------------------------------
 
+    @write_op
     def delete_item(self, item_id: str) -> None:
-        conn = self._get_conn()
-        conn.execute(
-            "DELETE FROM shopping_items WHERE id = ?",
-            (item_id,),
-        )
-        conn.commit()
\ No newline at end of file
+        with self.get_conn() as conn:
+            conn.execute(
+                LOG_ITEM_CHANGE_SQL,
+                ("delete", None, int(time.time()), to_key(item_id)),
+            )
+            conn.execute(
+                "DELETE FROM shopping_items WHERE id = ?",
+                (to_key(item_id),),
+            )
+            conn.commit()
+
+
+def _payload(row) -> str:
+    return json.dumps(dict(row), ensure_ascii=False)
+
+
+@contextmanager
+def _active_list_guard():
+    try:
+        yield
+    except sqlite3.IntegrityError as e:
+        if "shopping list is not active" in str(e):
+            raise InactiveListError() from e
+        raise
@@ -2,7 +2,9 @@ import time
 import uuid
 from typing import Optional
 
-from app.db.connection import get_connection
+from app.db.connection import get_connection, get_read_connection
+from app.db.write_queue import write_op
+from app.db.uuid_key import to_key
 from app.models.shopping_list import ShoppingList
 
 
@@ -11,27 +13,74 @@ class ShoppingListRepository:
     def get_conn(self):
         return get_connection()
 
+    def get_read_conn(self):
+        return get_read_connection()
+
     def get_active(self) -> Optional[ShoppingList]:
-        conn = get_connection()
-        row = conn.execute(
+        with self.get_read_conn() as conn:
+            row = conn.execute(
                 "SELECT * FROM shopping_lists WHERE status = 'active'"
             ).fetchone()
 
         return ShoppingList(**dict(row)) if row else None
 
-    def create_active(self) -> ShoppingList:
+    @write_op
+    def get_or_create_active(self) -> ShoppingList:
+        with self.get_conn() as conn:
+            row = conn.execute(
+                "SELECT * FROM shopping_lists WHERE status = 'active'"
+            ).fetchone()
+            if row:
+                return ShoppingList(**dict(row))
+
+            # another worker may create it first (idx_one_active_list)
+            conn.execute(
+                """
+                INSERT INTO shopping_lists (id, status, created_at_ts)
+                VALUES (?, 'active', ?)
+                ON CONFLICT DO NOTHING
+                """,
+                (uuid.uuid4().bytes, int(time.time())),
+            )
+            row = conn.execute(
+                "SELECT * FROM shopping_lists WHERE status = 'active'"
+            ).fetchone()
+            conn.commit()
+
+        return ShoppingList(**dict(row))
+
+    @write_op
+    def replace_active(self) -> ShoppingList:
+        # archive + create in one transaction
         list_id = str(uuid.uuid4())
         now = int(time.time())
-        conn = get_connection()
-        
-        conn.execute(
+
+        with self.get_conn() as conn:
+            conn.execute(
+                """
+                INSERT INTO shopping_changes
+                    (list_id, op, item_id, payload, changed_at_ts)
+                SELECT id, 'archive', NULL, NULL, ?
+                FROM shopping_lists WHERE status = 'active'
+                """,
+                (now,),
+            )
+            conn.execute(
+                """
+                UPDATE shopping_lists
+                SET status = 'archived', archived_at_ts = ?
+                WHERE status = 'active'
+                """,
+                (now,),
+            )
+            conn.execute(
                 """
                 INSERT INTO shopping_lists (id, status, created_at_ts)
                 VALUES (?, 'active', ?)
                 """,
-                (list_id, now),
+                (to_key(list_id), now),
             )
-        conn.commit()
+            conn.commit()
 
         return ShoppingList(
             id=list_id,
@@ -40,11 +89,50 @@ class ShoppingListRepository:
             external_ref=None,
         )
 
-    def archive_active(self) -> None:
+    @write_op
+    def compact_archived(self, before_ts: int) -> Optional[str]:
+        """
+        Replace the items of the oldest list archived before `before_ts`
+        by a summary row and drop its change log entries. Returns the
+        list id, None when there is nothing left to compact.
+        """
+        now = int(time.time())
 
-        conn = get_connection()
+        with self.get_conn() as conn:
+            row = conn.execute(
+                """
+                SELECT l.id FROM shopping_lists l
+                WHERE l.status = 'archived' AND l.archived_at_ts < ?
+                  AND NOT EXISTS (
+                    SELECT 1 FROM shopping_list_summaries s WHERE s.list_id = l.id
+                  )
+                ORDER BY l.archived_at_ts ASC
+                LIMIT 1
+                """,
+                (before_ts,),
+            ).fetchone()
+            if not row:
+                return None
 
-        conn.execute(
-                "UPDATE shopping_lists SET status = 'archived' WHERE status = 'active'"
+            list_key = to_key(row["id"])
+            conn.execute(
+                """
+                INSERT INTO shopping_list_summaries
+                    (list_id, item_count, items, compacted_at_ts)
+                SELECT ?, COUNT(*), json_group_array(json_array(name, category, quantity)), ?
+                FROM (
+                    SELECT p.name, c.name AS category, si.quantity
+                    FROM shopping_items si
+                    JOIN products p ON p.id = si.product_id
+                    JOIN category c ON c.id = p.category_id
+                    WHERE si.list_id = ?
+                    ORDER BY si.created_at_ts ASC, si.rowid ASC
+                )
+                """,
+                (list_key, now, list_key),
             )
-        conn.commit()
\ No newline at end of file
+            conn.execute("DELETE FROM shopping_items WHERE list_id = ?", (list_key,))
+            conn.execute("DELETE FROM shopping_changes WHERE list_id = ?", (list_key,))
+            conn.commit()
+
+        return row["id"]
@@ -0,0 +1,68 @@
+import os
+from dataclasses import dataclass
+from typing import Dict, List
+
+
+@dataclass(frozen=True)
+class StorageProfile:
+    """
+    Per-connection SQLite tuning for the storage the DB lives on.
+
+    cache_kib is per connection (both pools open up to POOL_SIZE each);
+    mmap'd pages live in the OS page cache and are shared by all of them.
+    """
+
+    synchronous: str
+    cache_kib: int
+    mmap_mib: int
+    temp_store: str
+    busy_timeout_ms: int
+
+    def pragmas(self) -> List[str]:
+        return [
+            f"PRAGMA synchronous = {self.synchronous}",
+            f"PRAGMA cache_size = -{self.cache_kib}",
+            f"PRAGMA mmap_size = {self.mmap_mib * 2**20}",
+            f"PRAGMA temp_store = {self.temp_store}",
+        ]
+
+
+PROFILES: Dict[str, StorageProfile] = {
+    # SD card, little RAM: no fsync per commit (WAL with NORMAL loses at
+    # most the last commits on power loss, never consistency), reads
+    # through mmap instead of large private caches, sorts in memory
+    "kiosk-sd": StorageProfile(
+        synchronous="NORMAL",
+        cache_kib=4 * 1024,
+        mmap_mib=64,
+        temp_store="MEMORY",
+        busy_timeout_ms=5_000,
+    ),
+    "server-ssd": StorageProfile(
+        synchronous="NORMAL",
+        cache_kib=32 * 1024,
+        mmap_mib=1024,
+        temp_store="MEMORY",
+        busy_timeout_ms=10_000,
+    ),
+    # every commit fsynced; no mmap, so an I/O error is an error, not SIGBUS
+    "durable": StorageProfile(
+        synchronous="FULL",
+        cache_kib=8 * 1024,
+        mmap_mib=0,
+        temp_store="FILE",
+        busy_timeout_ms=30_000,
+    ),
+}
+
+
+def get_profile(name: str) -> StorageProfile:
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown storage profile {name!r}, expected one of {', '.join(PROFILES)}"
+        ) from None
+
+
+STORAGE_PROFILE = get_profile(os.getenv("DB_STORAGE_PROFILE", "durable"))
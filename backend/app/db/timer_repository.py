@@ -1,5 +1,9 @@
+from typing import List, Optional
+
 from app.models.timer import Timer, TimerStatus
-from app.db.connection import get_connection
+from app.db.connection import get_connection, get_read_connection
+from app.db.write_queue import write_op
+from app.db.uuid_key import to_key
 
 
 class TimerRepository:
@@ -7,33 +11,42 @@ class TimerRepository:
     def get_conn(self):
         return get_connection()
 
+    def get_read_conn(self):
+        return get_read_connection()
+
+    @write_op
     def save(self, timer: Timer) -> None:
 
-        conn = self.get_conn()
-        conn.execute(
-            """
-            INSERT OR REPLACE INTO timers
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (
-                timer.id,
-                timer.name,
-                timer.duration_sec,
-                timer.remaining_sec,
-                timer.status,
-                timer.started_at,
-            ),
-        )
-        conn.commit()
-
-    def get(self, timer_id: str) -> Timer:
-        conn = self.get_conn()
-
-        row = conn.execute("SELECT * FROM timers WHERE id = ?", (timer_id,)).fetchone()
-        return Timer(**dict(row))
+        with self.get_conn() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO timers (
+                    id, name, duration_sec, remaining_sec,
+                    status, started_at, finished_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    to_key(timer.id),
+                    timer.name,
+                    timer.duration_sec,
+                    timer.remaining_sec,
+                    timer.status,
+                    timer.started_at,
+                    timer.finished_at,
+                ),
+            )
+            conn.commit()
+
+    def find(self, timer_id: str) -> Optional[Timer]:
+        with self.get_read_conn() as conn:
+            row = conn.execute(
+                "SELECT * FROM timers WHERE id = ?", (to_key(timer_id),)
+            ).fetchone()
+        return Timer(**dict(row)) if row else None
 
     def list_by_status(self, status: TimerStatus) -> list[Timer]:
-        with self.get_conn() as conn:
+        with self.get_read_conn() as conn:
             rows = conn.execute(
                 "SELECT * FROM timers WHERE status = ?", (status.value,)  # ← КЛЮЧОВЕ
             ).fetchall()
@@ -41,9 +54,8 @@ class TimerRepository:
         return [Timer(**dict(r)) for r in rows]
 
     def list_timers(self) -> list[Timer]:
-        conn = self.get_conn()
-
-        rows = conn.execute("SELECT * FROM timers").fetchall()
+        with self.get_read_conn() as conn:
+            rows = conn.execute("SELECT * FROM timers").fetchall()
 
         timers = []
 
@@ -53,13 +65,35 @@ class TimerRepository:
 
         return timers
 
+    @write_op
     def delete_timer(self, timer_id: str) -> bool:
-        conn = self.get_conn()
-
-        cur = conn.cursor()
+        with self.get_conn() as conn:
+            cur = conn.cursor()
 
-        cur.execute("DELETE FROM timers WHERE id = ? RETURNING id", (timer_id,))
-        row = cur.fetchone()
-        conn.commit()
+            cur.execute(
+                "DELETE FROM timers WHERE id = ? RETURNING id", (to_key(timer_id),)
+            )
+            row = cur.fetchone()
+            conn.commit()
 
         return row is not None
+
+    @write_op
+    def delete_finished(self, before_ts: int, limit: int) -> List[str]:
+        # one batch of timers finished before `before_ts`
+        with self.get_conn() as conn:
+            rows = conn.execute(
+                """
+                DELETE FROM timers
+                WHERE id IN (
+                    SELECT id FROM timers
+                    WHERE status = 'finished' AND finished_at < ?
+                    LIMIT ?
+                )
+                RETURNING id
+                """,
+                (before_ts, limit),
+            ).fetchall()
+            conn.commit()
+
+        return [r["id"] for r in rows]
@@ -0,0 +1,135 @@
+import functools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple, TypeVar
+
+from app.db.connection import in_transaction, savepoint, transaction
+
+# off by default: every write commits on the caller's thread
+GROUP_COMMIT = os.getenv("DB_GROUP_COMMIT", "0") == "1"
+GROUP_COMMIT_WINDOW_MS = float(os.getenv("DB_GROUP_COMMIT_WINDOW_MS", "2"))
+GROUP_COMMIT_MAX_OPS = 64
+
+T = TypeVar("T")
+
+_Write = Tuple[Callable[[], object], Future]
+
+
+class GroupCommitWriter:
+    """
+    Single writer thread for repository writes.
+
+    Queued writes are drained in groups: after the first one the writer
+    waits up to `window_sec` for more (at most `max_ops`) and commits the
+    whole group in one transaction, i.e. one write lock and one fsync.
+    Every write runs in its own savepoint, so a failing one is rolled back
+    alone and its caller gets the error; the others get their results
+    once the group has committed.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = GROUP_COMMIT,
+        window_sec: float = GROUP_COMMIT_WINDOW_MS / 1000,
+        max_ops: int = GROUP_COMMIT_MAX_OPS,
+    ):
+        self.enabled = enabled
+        self.window_sec = window_sec
+        self.max_ops = max_ops
+
+        self._queue: "queue.Queue[Optional[_Write]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        future: Future = Future()
+        self._ensure_started()
+        self._queue.put((functools.partial(fn, *args, **kwargs), future))
+        return future.result()
+
+    def stop(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="db-writer",
+                    daemon=True,
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            group, stop = self._collect(first)
+            self._commit(group)
+            if stop:
+                return
+
+    def _collect(self, first: _Write) -> Tuple[List[_Write], bool]:
+        group = [first]
+        deadline = time.monotonic() + self.window_sec
+
+        while len(group) < self.max_ops:
+            timeout = deadline - time.monotonic()
+            try:
+                write = self._queue.get(timeout=timeout) if timeout > 0 \
+                    else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if write is None:
+                return group, True
+            group.append(write)
+
+        return group, False
+
+    def _commit(self, group: List[_Write]) -> None:
+        outcomes = []
+        try:
+            with transaction():
+                for call, future in group:
+                    try:
+                        with savepoint("write_op"):
+                            outcomes.append((future, call(), None))
+                    except Exception as e:
+                        outcomes.append((future, None, e))
+        except Exception as e:
+            # nothing of this group was committed
+            for _, future in group:
+                future.set_exception(e)
+            return
+
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+writer = GroupCommitWriter()
+
+
+def write_op(method: Callable[..., T]) -> Callable[..., T]:
+    """
+    Repository write method: queued to `writer` in group commit mode,
+    called directly otherwise or when already inside a transaction.
+    """
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        if not writer.enabled or in_transaction():
+            return method(*args, **kwargs)
+        return writer.submit(method, *args, **kwargs)
+
+    return wrapper
@@ -1,4 +1,5 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
 import threading
@@ -8,11 +9,20 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from app.db.init_db import init_db
+from app.db.connection import close_connections
+from app.db.executor import DbOverloadedError, db_executor
+from app.db.maintenance import db_maintenance
+from app.db.write_queue import writer
 from app.api.timers import router as timers_router
 from app.api.shopping import router as shopping_router
 from app.api.products import router as products_router
 from app.api.category import router as category_router
+from app.api.batch import router as batch_router
+from app.api.home import router as home_router
+from app.api.maintenance import router as maintenance_router
 from app.scheduler.timer_loop import run_timer_loop
+from app.scheduler.retention_loop import run_retention_loop
+from app.services.container import product_service
 
 ENV = os.getenv("ENV", "dev")
 
@@ -20,22 +30,39 @@ ENV = os.getenv("ENV", "dev")
 async def lifespan(app: FastAPI):
     # startup only
     init_db()
+    product_service.load_index()
     start_scheduler()
     yield
-    # nothing on shutdown
+    db_maintenance.stop()
+    db_executor.shutdown()
+    writer.stop()
+    close_connections()
 
 def start_scheduler():
-    thread = threading.Thread(
-        target=run_timer_loop,
-        daemon=True
-    )
-    thread.start()
+    for loop in (run_timer_loop, run_retention_loop):
+        thread = threading.Thread(
+            target=loop,
+            daemon=True
+        )
+        thread.start()
+    db_maintenance.start()
 
 app = FastAPI(lifespan=lifespan, title="Kitchy Backend")
 app.include_router(timers_router)
 app.include_router(shopping_router)
 app.include_router(products_router)
 app.include_router(category_router)
+app.include_router(batch_router)
+app.include_router(home_router)
+app.include_router(maintenance_router)
+
+@app.exception_handler(DbOverloadedError)
+async def db_overloaded(request: Request, exc: DbOverloadedError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database busy, retry shortly"},
+        headers={"Retry-After": "1"},
+    )
 
 if ENV == "dev":
     app.add_middleware(
@@ -44,6 +71,7 @@ if ENV == "dev":
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag", "X-Change-Seq"],
     )
 
 if ENV == "prod":
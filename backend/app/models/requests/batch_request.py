@@ -0,0 +1,59 @@
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, Field, StrictStr
+
+BatchOp = Literal[
+    "shopping.add",        # {name, category?}
+    "shopping.add_many",   # {items: [{name, category?}]}
+    "shopping.quantity",   # {item_id, quantity}
+    "shopping.delete",     # {item_id}
+    "shopping.done",       # {}
+    "timer.create",        # {duration_sec, name}
+    "timer.start",         # {timer_id}
+    "timer.pause",         # {timer_id}
+    "timer.delete",        # {timer_id}
+]
+
+
+class BatchOperation(BaseModel):
+    key: str = Field(..., min_length=1, max_length=128)  # idempotency key
+    op: BatchOp
+    args: Dict[str, Any] = {}
+
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation] = Field(..., min_items=1, max_items=200)
+
+
+# --------------------------------------------------
+# ARGS per op (strict: a number is not a name)
+# --------------------------------------------------
+
+class NoArgs(BaseModel):
+    pass
+
+
+class AddArgs(BaseModel):
+    name: StrictStr
+    category: Optional[StrictStr] = None
+
+
+class AddManyArgs(BaseModel):
+    items: List[AddArgs]
+
+
+class QuantityArgs(BaseModel):
+    item_id: StrictStr
+    quantity: StrictStr
+
+
+class ItemArgs(BaseModel):
+    item_id: StrictStr
+
+
+class TimerCreateArgs(BaseModel):
+    name: StrictStr
+    duration_sec: int
+
+
+class TimerArgs(BaseModel):
+    timer_id: StrictStr
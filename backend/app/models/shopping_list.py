@@ -7,4 +7,5 @@ class ShoppingList:
     id: str
     status: str              # 'active' | 'archived'
     created_at_ts: int
-    external_ref: Optional[str]
\ No newline at end of file
+    external_ref: Optional[str]
+    archived_at_ts: Optional[int] = None
\ No newline at end of file
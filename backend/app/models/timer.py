@@ -15,3 +15,4 @@ class Timer(BaseModel):
     remaining_sec: int
     status: TimerStatus
     started_at: Optional[int] = None
+    finished_at: Optional[int] = None
@@ -0,0 +1,14 @@
+from typing import Any, List, Optional
+from pydantic import BaseModel
+
+
+class BatchOperationResult(BaseModel):
+    key: str
+    status: int               # HTTP status the single endpoint would return
+    result: Optional[Any]
+    error: Optional[str]
+    replayed: bool            # stored result of an earlier attempt
+
+
+class BatchResult(BaseModel):
+    results: List[BatchOperationResult]
@@ -0,0 +1,16 @@
+from typing import List
+from pydantic import BaseModel
+
+from app.models.category import Category
+from app.models.shopping_list import ShoppingList
+from app.models.timer import Timer
+from app.models.views.shopping_item_view import ShoppingItemView
+
+
+class HomeSnapshot(BaseModel):
+    server_time: int
+    timers: List[Timer]
+    shopping_list: ShoppingList
+    items: List[ShoppingItemView]
+    change_seq: int     # /api/shopping/changes cursor matching `items`
+    categories: List[Category]
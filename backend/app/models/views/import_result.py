@@ -0,0 +1,13 @@
+from typing import List
+from pydantic import BaseModel
+
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class ImportResult(BaseModel):
+    imported: int
+    skipped: int
+    errors: List[ImportRowError]
@@ -0,0 +1,23 @@
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel
+
+
+class MaintenanceStep(BaseModel):
+    name: str                 # checkpoint, optimize, analyze, incremental_vacuum
+    ms: float
+    detail: Dict[str, Any]
+
+
+class MaintenanceRun(BaseModel):
+    started_at: int
+    forced: bool              # POST /api/maintenance/run: no idle / size limits
+    idle_sec: float           # since the last committed write
+    ms: float
+    steps: List[MaintenanceStep]
+    error: Optional[str]
+
+
+class MaintenanceStatus(BaseModel):
+    interval_sec: float
+    idle_after_sec: float
+    runs: List[MaintenanceRun]    # newest first
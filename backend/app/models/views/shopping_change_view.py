@@ -0,0 +1,21 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+from app.models.views.shopping_item_view import ShoppingItemView
+
+
+class ShoppingChangeView(BaseModel):
+    seq: int
+    op: str                          # add | quantity | delete | clear | archive
+    list_id: str
+    item_id: Optional[str]
+    item: Optional[ShoppingItemView]  # add
+    quantity: Optional[str]           # quantity
+    changed_at_ts: int
+
+
+class ShoppingChangesView(BaseModel):
+    seq: int        # cursor for the next `since`
+    reset: bool     # cursor older than the log, refetch the full list
+    more: bool      # limit reached, call again with `seq`
+    changes: List[ShoppingChangeView]
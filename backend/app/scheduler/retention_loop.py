@@ -0,0 +1,23 @@
+import logging
+import time
+from app.services.container import retention_service
+
+logger = logging.getLogger(__name__)
+
+RETENTION_SWEEP_SEC = 60
+
+def run_retention_loop():
+    while True:
+        time.sleep(RETENTION_SWEEP_SEC)
+        try:
+            swept = retention_service.sweep()
+        except Exception:
+            # e.g. DB busy: next sweep picks up where this one stopped
+            logger.exception("retention sweep failed")
+            continue
+
+        if any(swept.values()):
+            logger.info(
+                "retention: purged %(timers)d timers, compacted %(lists)d lists",
+                swept,
+            )
@@ -1,8 +1,8 @@
 import time
-from app.services.container import timer_service
+from app.services.container import timer_service, timer_scheduler
 
 def run_timer_loop():
+    timer_service.schedule_running_timers()
     while True:
-        now = int(time.time())
-        timer_service.tick_timers(now)
-        time.sleep(1)
\ No newline at end of file
+        due = timer_scheduler.wait_due()
+        timer_service.fire_due_timers(due, int(time.time()))
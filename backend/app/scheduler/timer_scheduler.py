@@ -0,0 +1,94 @@
+import heapq
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class TimerScheduler:
+    """
+    In-memory min-heap of running timer deadlines.
+
+    The timer loop sleeps until the earliest deadline and is woken up
+    whenever the schedule changes. Cancelled / rescheduled entries stay
+    in the heap and are skipped lazily when they reach the top.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, str]] = []
+        self._deadlines: Dict[str, float] = {}
+        self._cond = threading.Condition()
+
+    # --------------------------------------------------
+    # SCHEDULE
+    # --------------------------------------------------
+
+    def schedule(self, timer_id: str, deadline: float) -> None:
+        with self._cond:
+            self._deadlines[timer_id] = deadline
+            heapq.heappush(self._heap, (deadline, timer_id))
+            self._compact()
+            self._cond.notify_all()
+
+    def cancel(self, timer_id: str) -> None:
+        with self._cond:
+            if self._deadlines.pop(timer_id, None) is not None:
+                self._compact()
+                self._cond.notify_all()
+
+    def reset(self, deadlines: Dict[str, float]) -> None:
+        with self._cond:
+            self._deadlines = dict(deadlines)
+            self._heap = [(d, t) for t, d in self._deadlines.items()]
+            heapq.heapify(self._heap)
+            self._cond.notify_all()
+
+    def next_deadline(self) -> Optional[float]:
+        with self._cond:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    # --------------------------------------------------
+    # WAIT
+    # --------------------------------------------------
+
+    def wait_due(self) -> List[str]:
+        """Block until at least one timer is due and return the due ids."""
+        with self._cond:
+            while True:
+                self._drop_stale()
+
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+
+                delay = self._heap[0][0] - time.time()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+
+                return self._pop_due(time.time())
+
+    # --------------------------------------------------
+    # INTERNAL (caller holds the lock)
+    # --------------------------------------------------
+
+    def _pop_due(self, now: float) -> List[str]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, timer_id = heapq.heappop(self._heap)
+            if self._deadlines.get(timer_id) == deadline:
+                del self._deadlines[timer_id]
+                due.append(timer_id)
+        return due
+
+    def _drop_stale(self) -> None:
+        while self._heap:
+            deadline, timer_id = self._heap[0]
+            if self._deadlines.get(timer_id) == deadline:
+                return
+            heapq.heappop(self._heap)
+
+    def _compact(self) -> None:
+        if len(self._heap) > 2 * len(self._deadlines) + 16:
+            self._heap = [(d, t) for t, d in self._deadlines.items()]
+            heapq.heapify(self._heap)
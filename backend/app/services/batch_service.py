@@ -0,0 +1,171 @@
+import json
+import logging
+import time
+from dataclasses import asdict, is_dataclass
+from typing import Any, Callable, Dict, List, Type
+
+from pydantic import BaseModel, ValidationError
+
+from app.db.connection import savepoint, transaction
+from app.db.idempotency_repository import IdempotencyRepository
+from app.models.requests.batch_request import (
+    AddArgs,
+    AddManyArgs,
+    BatchOperation,
+    ItemArgs,
+    NoArgs,
+    QuantityArgs,
+    TimerArgs,
+    TimerCreateArgs,
+)
+from app.models.views.batch_result import BatchOperationResult, BatchResult
+from app.services.shopping_service import ShoppingService
+from app.services.timer_service import TimerNotFoundError, TimerService
+
+logger = logging.getLogger(__name__)
+
+# how long a retried key still returns its stored result
+IDEMPOTENCY_TTL_SEC = 7 * 24 * 3600
+
+# args of every op, validated before it runs
+ARGS: Dict[str, Type[BaseModel]] = {
+    "shopping.add": AddArgs,
+    "shopping.add_many": AddManyArgs,
+    "shopping.quantity": QuantityArgs,
+    "shopping.delete": ItemArgs,
+    "shopping.done": NoArgs,
+    "timer.create": TimerCreateArgs,
+    "timer.start": TimerArgs,
+    "timer.pause": TimerArgs,
+    "timer.delete": TimerArgs,
+}
+
+
+class BatchService:
+    """
+    Applies an ordered list of shopping / timer operations in one write
+    transaction (one commit).
+
+    Every operation runs in its own savepoint, so a failing one is rolled
+    back alone and reported in its result. Results are stored by the
+    client's idempotency key in the same transaction: a retried key gets
+    the stored result back and is not applied again.
+
+    Events, timer scheduling and cache updates (categories, product
+    index, usage) of the operations that were not rolled back are
+    applied once the batch has committed.
+    """
+
+    def __init__(
+        self,
+        shopping_service: ShoppingService,
+        timer_service: TimerService,
+        key_repo: IdempotencyRepository,
+    ):
+        self.shopping_service = shopping_service
+        self.timer_service = timer_service
+        self.key_repo = key_repo
+
+        self._handlers: Dict[str, Callable[[Any], Any]] = {
+            "shopping.add": lambda a: shopping_service.add_item(
+                a.name, a.category
+            ),
+            "shopping.add_many": lambda a: shopping_service.add_items(
+                [(i.name, i.category) for i in a.items]
+            ),
+            "shopping.quantity": lambda a: shopping_service.update_quantity(
+                a.item_id, a.quantity
+            ),
+            "shopping.delete": lambda a: shopping_service.delete_item(a.item_id),
+            "shopping.done": lambda a: shopping_service.done(),
+            "timer.create": lambda a: timer_service.create(
+                name=a.name,
+                duration_sec=a.duration_sec,
+            ),
+            "timer.start": lambda a: timer_service.start(a.timer_id),
+            "timer.pause": lambda a: timer_service.pause(a.timer_id),
+            "timer.delete": lambda a: timer_service.delete_timer(a.timer_id),
+        }
+
+    def apply(self, operations: List[BatchOperation]) -> BatchResult:
+        now = int(time.time())
+        results: List[BatchOperationResult] = []
+
+        with transaction():
+            self.key_repo.prune(now - IDEMPOTENCY_TTL_SEC)
+            stored = self.key_repo.find([o.key for o in operations])
+
+            for operation in operations:
+                if operation.key in stored:
+                    results.append(
+                        BatchOperationResult(
+                            key=operation.key,
+                            replayed=True,
+                            **stored[operation.key],
+                        )
+                    )
+                    continue
+
+                result = self._apply_one(operation)
+                results.append(result)
+
+                # server errors stay retryable
+                if result.status < 500:
+                    outcome = result.dict(include={"status", "result", "error"})
+                    self.key_repo.save(operation.key, outcome, now)
+                    stored[operation.key] = outcome
+
+        return BatchResult(results=results)
+
+    def _apply_one(self, operation: BatchOperation) -> BatchOperationResult:
+        try:
+            args = ARGS[operation.op].parse_obj(operation.args)
+        except ValidationError as e:
+            return _failed(operation, 400, f"Invalid arguments: {_describe(e)}")
+
+        try:
+            with savepoint("batch_op"):
+                value = self._handlers[operation.op](args)
+        except TimerNotFoundError as e:
+            return _failed(operation, 404, str(e))
+        except ValueError as e:
+            # services reject bad values with ValueError; anything else
+            # is a bug and must stay retryable
+            return _failed(operation, 400, f"Invalid arguments: {e}")
+        except Exception:
+            logger.exception("batch operation %s failed", operation.op)
+            return _failed(operation, 500, "Internal error")
+
+        return BatchOperationResult(
+            key=operation.key,
+            status=200,
+            result=_jsonable(value),
+            error=None,
+            replayed=False,
+        )
+
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in error.errors()
+    )
+
+
+def _failed(operation: BatchOperation, status: int, error: str) -> BatchOperationResult:
+    return BatchOperationResult(
+        key=operation.key,
+        status=status,
+        result=None,
+        error=error,
+        replayed=False,
+    )
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return json.loads(value.json())
+    if is_dataclass(value):
+        return asdict(value)
+    if isinstance(value, list):
+        return [_jsonable(v) for v in value]
+    return value
@@ -1,23 +1,74 @@
-from typing import List, Optional
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
 
-from app.db.category_repository import CategoryRepository
+from app.db.category_repository import CategoryRepository, DEFAULT_CATEGORY_ID
+from app.db.connection import after_commit
+from app.db.data_version import data_versions
 from app.models.category import Category
+from app.services.event_hub import Event, EventHub
+from app.services.product_index import ProductIndex
 
 
 class CategoryService:
-
-    def __init__(self, repo: CategoryRepository):
+    """
+    Owns an in-process copy of the category table.
+
+    Categories change rarely, so lookups by id / name and the sorted
+    listing are served from memory. Every write goes to the repository
+    first and is applied to the cache once committed (write-through, see
+    `after_commit`). The lock only guards the cache, never a repository
+    call: the caller may hold the SQLite write lock. Writes that bypass
+    this service must call `remember` / `reload`.
+    """
+
+    def __init__(
+        self,
+        repo: CategoryRepository,
+        index: ProductIndex,
+        shopping_events: Optional[EventHub] = None,
+    ):
         self.repo = repo
+        self.index = index
+        self.shopping_events = shopping_events
+
+        self._lock = threading.RLock()
+        self._by_id: Optional[Dict[str, Category]] = None
+        self._by_name: Dict[str, Category] = {}
+        self._sorted: List[Category] = []
 
     # --------------------------------------------------
     # READ
     # --------------------------------------------------
 
     def list_all(self) -> List[Category]:
-        return self.repo.list_all()
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._sorted)
+
+    def etag(self) -> str:
+        return data_versions.etag("category")
 
     def get_by_id(self, category_id: str) -> Optional[Category]:
-        return self.repo.get_by_id(category_id)
+        with self._lock:
+            self._ensure_loaded()
+            return self._by_id.get(category_id)
+
+    def get_by_name(self, name: str) -> Optional[Category]:
+        with self._lock:
+            self._ensure_loaded()
+            return self._by_name.get((name or "").strip().casefold())
+
+    def get_default(self) -> Category:
+        with self._lock:
+            self._ensure_loaded()
+            category = self._by_id.get(DEFAULT_CATEGORY_ID)
+        if category:
+            return category
+
+        self.repo.ensure_default_exists()
+        category = self.repo.get_by_id(DEFAULT_CATEGORY_ID)
+        self._apply(lambda: self._put(category))
+        return category
 
     # --------------------------------------------------
     # CREATE
@@ -29,11 +80,14 @@ class CategoryService:
         if not clean:
             raise ValueError("Category name cannot be empty")
 
-        existing = self.repo.get_by_name(clean)
+        existing = self.get_by_name(clean)
         if existing:
             return existing
 
-        return self.repo.create(clean)
+        # the existing row if the name was created meanwhile
+        category = self.repo.create(clean)
+        self._apply(lambda: self._put(category))
+        return category
 
     # --------------------------------------------------
     # UPDATE
@@ -49,11 +103,82 @@ class CategoryService:
         if not updated:
             return None
 
-        return self.repo.get_by_id(category_id)
+        category = Category(id=category_id, name=clean)
+        self._apply(lambda: self._put(category))
+        return category
 
     # --------------------------------------------------
     # DELETE
     # --------------------------------------------------
 
     def delete(self, category_id: str) -> bool:
-        return self.repo.delete(category_id)
\ No newline at end of file
+        deletion = self.repo.delete(category_id)
+        if deletion is None:
+            return False
+
+        def drop() -> None:
+            self._drop(category_id)
+            for product_id in deletion.merged_product_ids:
+                self.index.remove_product(product_id)
+            self.index.remove_category(category_id, DEFAULT_CATEGORY_ID)
+
+        self._apply(drop)
+
+        # items whose product was merged: same id, new product
+        for item in deletion.moved_items:
+            self._publish({"type": "delete", "item_id": item.id})
+            self._publish({"type": "add", "item": item.dict()})
+        return True
+
+    # --------------------------------------------------
+    # CACHE
+    # --------------------------------------------------
+
+    def remember(self, categories: Iterable[Category]) -> None:
+        # categories written elsewhere (e.g. bulk import)
+        categories = list(categories)
+
+        def put_all() -> None:
+            for category in categories:
+                self._put(category)
+
+        self._apply(put_all)
+
+    def reload(self) -> None:
+        with self._lock:
+            self._load(self.repo.list_all())
+
+    def _ensure_loaded(self) -> None:
+        if self._by_id is None:
+            self._load(self.repo.list_all())
+
+    def _load(self, categories: Iterable[Category]) -> None:
+        self._by_id = {c.id: c for c in categories}
+        self._rebuild()
+
+    def _apply(self, update: Callable[[], object]) -> None:
+        # cache updates wait for the commit (see `transaction()`)
+        def locked() -> None:
+            with self._lock:
+                self._ensure_loaded()
+                update()
+
+        after_commit(locked)
+
+    def _put(self, category: Category) -> None:
+        self._by_id[category.id] = category
+        self._rebuild()
+        self.index.put_category(category)
+
+    def _drop(self, category_id: str) -> None:
+        self._by_id.pop(category_id, None)
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        self._by_name = {c.name.casefold(): c for c in self._by_id.values()}
+        # same order as ORDER BY name (UTF-8 byte order == code point order)
+        self._sorted = sorted(self._by_id.values(), key=lambda c: c.name)
+
+    def _publish(self, event: Event) -> None:
+        if self.shopping_events:
+            after_commit(lambda: self.shopping_events.publish(event))
@@ -3,11 +3,19 @@ from app.db.product_repository import ProductRepository
 from app.db.category_repository import CategoryRepository
 from app.db.shopping_list_repository import ShoppingListRepository
 from app.db.shopping_item_repository import ShoppingItemRepository
+from app.db.shopping_change_repository import ShoppingChangeRepository
+from app.db.idempotency_repository import IdempotencyRepository
+from app.scheduler.timer_scheduler import TimerScheduler
+from app.services.event_hub import EventHub
+from app.services.product_index import ProductIndex
 
 from app.services.shopping_service import ShoppingService
 from app.services.timer_service import TimerService
 from app.services.product_service import ProductService
 from app.services.category_service import CategoryService
+from app.services.batch_service import BatchService
+from app.services.home_service import HomeService
+from app.services.retention_service import RetentionService
 
 
 ## Repositories
@@ -15,14 +23,33 @@ product_repo = ProductRepository()
 category_repo = CategoryRepository()
 shopping_list_repo = ShoppingListRepository()
 shopping_item_repo = ShoppingItemRepository()
+shopping_change_repo = ShoppingChangeRepository()
+idempotency_repo = IdempotencyRepository()
 
 
 ## Services
-product_service = ProductService(product_repo, category_repo)
-category_service = CategoryService(category_repo)
+product_index = ProductIndex()
+shopping_events = EventHub()
+category_service = CategoryService(category_repo, product_index, shopping_events)
+product_service = ProductService(product_repo, category_service, product_index)
 shopping_service = ShoppingService(
-    product_repo=product_repo,
+    product_service=product_service,
     list_repo=shopping_list_repo,
-    item_repo=shopping_item_repo 
+    item_repo=shopping_item_repo,
+    change_repo=shopping_change_repo,
+    events=shopping_events,
+)
+timer_scheduler = TimerScheduler()
+timer_events = EventHub()
+timer_service = TimerService(TimerRepository(), timer_scheduler, timer_events)
+retention_service = RetentionService(timer_service, shopping_list_repo)
+home_service = HomeService(
+    timer_service=timer_service,
+    shopping_service=shopping_service,
+    category_repo=category_repo,
+)
+batch_service = BatchService(
+    shopping_service=shopping_service,
+    timer_service=timer_service,
+    key_repo=idempotency_repo,
 )
-timer_service = TimerService(TimerRepository())
@@ -0,0 +1,63 @@
+import asyncio
+import threading
+from typing import Any, Dict, List, Tuple
+
+Event = Dict[str, Any]
+
+# queue marker telling a subscriber it fell behind and must resync
+OVERFLOW = None
+
+
+class EventHub:
+    """
+    In-process fan-out of events to async subscribers.
+
+    `publish` is thread-safe, so services running in the threadpool or in
+    the timer loop thread can push events to every open stream. A
+    subscriber whose queue fills up gets OVERFLOW and is dropped; the
+    client is expected to reconnect and start from a fresh snapshot.
+    """
+
+    def __init__(self, max_queue: int = 256):
+        self.max_queue = max_queue
+        self._subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue + 1)
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            self._subscribers.append((loop, queue))
+
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers = [
+                (loop, q) for loop, q in self._subscribers if q is not queue
+            ]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event: Event) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, event)
+            except RuntimeError:
+                # event loop already closed
+                self.unsubscribe(queue)
+
+    def _deliver(self, queue: asyncio.Queue, event: Event) -> None:
+        if queue.qsize() >= self.max_queue:
+            self.unsubscribe(queue)
+            if not queue.full():
+                queue.put_nowait(OVERFLOW)
+            return
+
+        queue.put_nowait(event)
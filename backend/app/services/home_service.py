@@ -0,0 +1,45 @@
+import time
+
+from app.db.category_repository import CategoryRepository
+from app.db.connection import transaction
+from app.services.shopping_service import ShoppingService
+from app.services.timer_service import TimerService
+
+
+class HomeService:
+    """
+    Everything the home screen needs on load, read from one WAL snapshot
+    so timers, the active list, its items and categories agree.
+    """
+
+    def __init__(
+        self,
+        timer_service: TimerService,
+        shopping_service: ShoppingService,
+        category_repo: CategoryRepository,
+    ):
+        self.timer_service = timer_service
+        self.shopping_service = shopping_service
+        self.category_repo = category_repo
+
+    def snapshot(self) -> dict:
+        # shaped as HomeSnapshot (validated by the endpoint)
+        with transaction(read_only=True):
+            timers = self.timer_service.list_timers()
+            shopping_list = self.shopping_service.find_active_list()
+            items = self.shopping_service.list_items()
+            change_seq = self.shopping_service.change_seq()
+            categories = self.category_repo.list_all()
+
+        if shopping_list is None:
+            # first run: nothing in the snapshot to be inconsistent with
+            shopping_list = self.shopping_service.get_current_list()
+
+        return dict(
+            server_time=int(time.time()),
+            timers=timers,
+            shopping_list=shopping_list,
+            items=items,
+            change_seq=change_seq,
+            categories=categories,
+        )
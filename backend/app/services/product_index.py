@@ -0,0 +1,230 @@
+import bisect
+import threading
+import unicodedata
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.models.category import Category
+from app.models.product import Product
+from app.models.views.product_view import ProductView
+from app.services.trigram_index import TrigramIndex
+
+# prefix matches considered for popularity ranking per lookup
+RANK_WINDOW = 500
+
+
+def normalize(text: str) -> str:
+    # case, whitespace and diacritics insensitive: "creme" finds "Crème"
+    decomposed = unicodedata.normalize("NFKD", (text or "").casefold())
+    return " ".join(
+        "".join(c for c in decomposed if not unicodedata.combining(c)).split()
+    )
+
+
+class ProductIndex:
+    """
+    In-memory prefix index over product names for autocomplete.
+
+    Two sorted arrays of (key, product_id) are kept:
+      - full case-folded names, so "mi" finds "Milk";
+      - the name from every later word on, so "mi" finds "Oat milk".
+    Matches are ranked by decayed usage (see app/db/product_usage.py),
+    then name-prefix hits before word-prefix hits, then by name.
+    A trigram index over the same names serves typo-tolerant lookups.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._products: Dict[str, Product] = {}
+        self._categories: Dict[str, str] = {}
+        self._usage: Dict[str, float] = {}
+        self._names: List[Tuple[str, str]] = []
+        self._words: List[Tuple[str, str]] = []
+        self._trigrams = TrigramIndex()
+        self._journal: Optional[List[Callable[[], None]]] = None
+
+    # --------------------------------------------------
+    # LOAD
+    # --------------------------------------------------
+
+    def begin_load(self) -> None:
+        # call before reading the data for `load`: changes made meanwhile
+        # are replayed over it (a usage bump may then count twice)
+        with self._lock:
+            self._journal = []
+
+    def load(
+        self,
+        products: Iterable[Product],
+        categories: Iterable[Category],
+        usage: Optional[Dict[str, float]] = None,
+    ) -> None:
+        with self._lock:
+            self._categories = {c.id: c.name for c in categories}
+            self._usage = dict(usage or {})
+            self._products = {p.id: p for p in products}
+            self._names = []
+            self._words = []
+            self._trigrams.clear()
+
+            for p in self._products.values():
+                name_key, word_keys = self._keys(p.name)
+                self._names.append((name_key, p.id))
+                self._words.extend((k, p.id) for k in word_keys)
+                self._trigrams.add(p.id, name_key)
+
+            self._names.sort()
+            self._words.sort()
+
+            journal, self._journal = self._journal or [], None
+            for change in journal:
+                change()
+
+    # --------------------------------------------------
+    # PRODUCTS
+    # --------------------------------------------------
+
+    def put_product(self, product: Product) -> None:
+        with self._lock:
+            self._log(lambda: self.put_product(product))
+            existing = self._products.get(product.id)
+            if existing and existing.name == product.name:
+                self._products[product.id] = product
+                return
+
+            if existing:
+                self._unlink(existing)
+
+            self._products[product.id] = product
+            name_key, word_keys = self._keys(product.name)
+            bisect.insort(self._names, (name_key, product.id))
+            for k in word_keys:
+                bisect.insort(self._words, (k, product.id))
+            self._trigrams.add(product.id, name_key)
+
+    def remove_product(self, product_id: str) -> None:
+        with self._lock:
+            self._log(lambda: self.remove_product(product_id))
+            existing = self._products.pop(product_id, None)
+            self._usage.pop(product_id, None)
+            if existing:
+                self._unlink(existing)
+
+    def bump_usage(self, product_id: str, weight: float) -> None:
+        with self._lock:
+            self._log(lambda: self.bump_usage(product_id, weight))
+            self._usage[product_id] = self._usage.get(product_id, 0.0) + weight
+
+    # --------------------------------------------------
+    # CATEGORIES
+    # --------------------------------------------------
+
+    def put_category(self, category: Category) -> None:
+        with self._lock:
+            self._log(lambda: self.put_category(category))
+            self._categories[category.id] = category.name
+
+    def remove_category(self, category_id: str, fallback_id: str) -> None:
+        # mirrors ON DELETE SET DEFAULT on products.category_id
+        with self._lock:
+            self._log(lambda: self.remove_category(category_id, fallback_id))
+            self._categories.pop(category_id, None)
+            for p in list(self._products.values()):
+                if p.category_id == category_id:
+                    self._products[p.id] = Product(
+                        id=p.id,
+                        name=p.name,
+                        category_id=fallback_id,
+                    )
+
+    # --------------------------------------------------
+    # SEARCH
+    # --------------------------------------------------
+
+    def search(self, query: str, limit: int = 10) -> List[ProductView]:
+        q = normalize(query)
+        if not q:
+            return []
+
+        with self._lock:
+            ranked: List[Tuple[float, int, int, str]] = []
+            seen: Set[str] = set()
+
+            for tier, keys in enumerate((self._names, self._words)):
+                i = bisect.bisect_left(keys, (q, ""))
+                end = min(len(keys), i + RANK_WINDOW)
+                while i < end:
+                    key, product_id = keys[i]
+                    if not key.startswith(q):
+                        break
+                    if product_id not in seen:
+                        seen.add(product_id)
+                        usage = self._usage.get(product_id, 0.0)
+                        ranked.append((-usage, tier, i, product_id))
+                    i += 1
+
+            ranked.sort()
+            return [self._view(self._products[r[3]]) for r in ranked[:limit]]
+
+    def similar(
+        self,
+        query: str,
+        limit: int = 10,
+        min_similarity: float = 0.3,
+        category_id: Optional[str] = None,
+        budget_sec: float = 0.005,
+    ) -> List[Tuple[ProductView, float]]:
+
+        q = normalize(query)
+        if not q:
+            return []
+
+        with self._lock:
+            # over-fetch when filtering by category afterwards
+            fetch = limit if category_id is None else limit * 4
+            scored = self._trigrams.similar(q, fetch, min_similarity, budget_sec)
+
+            matches = []
+            for product_id, score in scored:
+                product = self._products[product_id]
+                if category_id is not None and product.category_id != category_id:
+                    continue
+                matches.append((self._view(product), score))
+
+            return matches[:limit]
+
+    # --------------------------------------------------
+    # INTERNAL
+    # --------------------------------------------------
+
+    def _log(self, change: Callable[[], None]) -> None:
+        if self._journal is not None:
+            self._journal.append(change)
+
+    def _view(self, product: Product) -> ProductView:
+        return ProductView(
+            id=product.id,
+            name=product.name,
+            category_id=product.category_id,
+            category_name=self._categories.get(product.category_id, ""),
+        )
+
+    def _unlink(self, product: Product) -> None:
+        name_key, word_keys = self._keys(product.name)
+        self._remove(self._names, (name_key, product.id))
+        for k in word_keys:
+            self._remove(self._words, (k, product.id))
+        self._trigrams.remove(product.id, name_key)
+
+    @staticmethod
+    def _remove(keys: List[Tuple[str, str]], entry: Tuple[str, str]) -> None:
+        i = bisect.bisect_left(keys, entry)
+        if i < len(keys) and keys[i] == entry:
+            del keys[i]
+
+    @staticmethod
+    def _keys(name: str) -> Tuple[str, List[str]]:
+        words = normalize(name).split(" ")
+        return (
+            " ".join(words),
+            [" ".join(words[i:]) for i in range(1, len(words))],
+        )
@@ -1,9 +1,35 @@
-from typing import List, Optional
+import base64
+import json
+import uuid
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from app.db.product_repository import ProductRepository
-from app.db.category_repository import CategoryRepository
+from app.db.product_repository import ProductKey, ProductRepository
+from app.db.category_repository import DEFAULT_CATEGORY_NAME
+from app.db.connection import after_commit
+from app.db.data_version import data_versions
+from app.db.product_usage import usage_weight
+from app.models.category import Category
 from app.models.product import Product
 from app.models.views.product_view import ProductView
+from app.models.views.import_result import ImportResult, ImportRowError
+from app.services.category_service import CategoryService
+from app.services.product_index import ProductIndex, normalize
+from app.services.product_transfer import ImportRow
+
+AUTOCOMPLETE_LIMIT = 10
+
+# trigram similarity for "did you mean" suggestions
+SUGGEST_SIMILARITY = 0.3
+
+# get_or_create reuses an existing product only for a near-exact name
+# ("tomatos" -> "Tomatoes", "creme" -> "Crème"): trigram candidates
+# are accepted within this many typos, by length of the shorter name.
+# "Milk" never resolves to "Oat milk"; those stay autocomplete hints.
+DEDUPE_CANDIDATES = 5
+DEDUPE_MAX_EDITS = ((6, 0), (11, 1), (None, 2))  # (shorter than, edits)
+
+# above this many new products a full index rebuild beats insorting
+REINDEX_THRESHOLD = 1000
 
 
 class ProductService:
@@ -11,10 +37,25 @@ class ProductService:
     def __init__(
         self,
         product_repo: ProductRepository,
-        category_repo: CategoryRepository,
+        category_service: CategoryService,
+        index: ProductIndex,
     ):
         self.product_repo = product_repo
-        self.category_repo = category_repo
+        self.category_service = category_service
+        self.index = index
+
+    def load_index(self) -> None:
+        self.index.begin_load()
+        self.index.load(
+            self.product_repo.list_all(),
+            self.category_service.list_all(),
+            self.product_repo.list_usage(),
+        )
+
+    def record_usage(self, product_id: str, used_at_ts: int) -> None:
+        # mirrors the product_usage bump done by ShoppingItemRepository.add
+        weight = usage_weight(used_at_ts)
+        after_commit(lambda: self.index.bump_usage(product_id, weight))
 
     # --------------------------------------------------
     # AUTOCOMPLETE (returns VIEW)
@@ -24,7 +65,32 @@ class ProductService:
         clean = (query or "").strip()
         if not clean or len(clean) < 2:
             return []
-        return self.product_repo.search_views_by_name(clean)
+
+        results = self.index.search(clean, AUTOCOMPLETE_LIMIT)
+        if len(results) == AUTOCOMPLETE_LIMIT:
+            return results
+
+        # not enough prefix hits (typo?) → fill with fuzzy matches
+        seen = {p.id for p in results}
+        for view, _ in self.index.similar(
+            clean,
+            limit=AUTOCOMPLETE_LIMIT,
+            min_similarity=SUGGEST_SIMILARITY,
+        ):
+            if view.id not in seen and len(results) < AUTOCOMPLETE_LIMIT:
+                results.append(view)
+
+        return results
+
+    # --------------------------------------------------
+    # SEARCH (full-text, returns VIEW)
+    # --------------------------------------------------
+
+    def search(self, query: str, limit: int = 20) -> List[ProductView]:
+        clean = (query or "").strip()
+        if not clean:
+            return []
+        return self.product_repo.search_views_by_name(clean, limit)
 
     # --------------------------------------------------
     # READ
@@ -36,8 +102,25 @@ class ProductService:
     def get_view_by_id(self, product_id: str) -> Optional[ProductView]:
         return self.product_repo.get_view_by_id(product_id)
 
-    def list_all(self, limit: int = 200) -> List[ProductView]:
-        return self.product_repo.list_all_views(limit)
+    def etag(self) -> str:
+        # views carry the category name
+        return data_versions.etag("products", "category")
+
+    def list_page(
+        self,
+        limit: int = 200,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[ProductView], Optional[str]]:
+
+        after = decode_cursor(cursor) if cursor else None
+        views = self.product_repo.list_all_views(limit, after)
+
+        next_cursor = encode_cursor(views[-1]) if len(views) == limit else None
+        return views, next_cursor
+
+    def stream_rows(self, cursor: Optional[str] = None) -> Iterator[dict]:
+        after = decode_cursor(cursor) if cursor else None
+        return self.product_repo.iter_view_rows(after)
 
     # --------------------------------------------------
     # CREATE
@@ -55,21 +138,16 @@ class ProductService:
         if not clean_name:
             raise ValueError("Product name cannot be empty")
 
-        # ensure category
-        if clean_category:
-            category = self.category_repo.get_by_name(clean_category)
-            if not category:
-                category = self.category_repo.create(clean_category)
-        else:
-            # fallback to default category
-            self.category_repo.ensure_default_exists()
-            category = self.category_repo.get_by_name("Other")
+        category = self._ensure_category(clean_category)
 
-        return self.product_repo.create(
+        product = self.product_repo.create(
             name=clean_name,
             category_id=category.id,
         )
 
+        after_commit(lambda: self.index.put_product(product))
+        return product
+
     def get_or_create(
         self,
         name: str,
@@ -82,20 +160,168 @@ class ProductService:
         if not clean_name:
             raise ValueError("Product name cannot be empty")
 
-        # ensure category
         if clean_category:
-            category = self.category_repo.get_by_name(clean_category)
-            if not category:
-                category = self.category_repo.create(clean_category)
+            category = self._ensure_category(clean_category)
+            duplicate = self.find_duplicate(clean_name, category.id)
         else:
-            self.category_repo.ensure_default_exists()
-            category = self.category_repo.get_by_name("Other")
+            # no category given → a match in any category will do
+            category = None
+            duplicate = self.find_duplicate(clean_name)
+
+        if duplicate:
+            return duplicate
 
-        return self.product_repo.get_or_create(
+        if category is None:
+            category = self.category_service.get_default()
+
+        product = self.product_repo.get_or_create(
             name=clean_name,
             category_id=category.id,
         )
 
+        after_commit(lambda: self.index.put_product(product))
+        return product
+
+    def resolve_many(
+        self,
+        items: List[Tuple[str, Optional[str]]],
+    ) -> Tuple[List[Product], List[Product], List[Category]]:
+        """
+        get_or_create for a batch, without writing: returns the product
+        of every item plus the products / categories that still have to
+        be inserted (see `remember` once they are).
+        """
+        products: List[Product] = []
+        new_products: Dict[Tuple[str, str], Product] = {}
+        new_categories: Dict[str, Category] = {}
+
+        for name, category_name in items:
+            clean_name = (name or "").strip()
+            clean_category = (category_name or "").strip()
+
+            if not clean_name:
+                raise ValueError("Product name cannot be empty")
+
+            if clean_category:
+                key = clean_category.casefold()
+                category = (
+                    new_categories.get(key)
+                    or self.category_service.get_by_name(clean_category)
+                )
+                if category is None:
+                    category = Category(id=str(uuid.uuid4()), name=clean_category)
+                    new_categories[key] = category
+                duplicate = self.find_duplicate(clean_name, category.id)
+            else:
+                category = None
+                duplicate = self.find_duplicate(clean_name)
+
+            if duplicate:
+                products.append(duplicate)
+                continue
+
+            if category is None:
+                category = self.category_service.get_default()
+
+            key = (normalize(clean_name), category.id)
+            product = new_products.get(key)
+            if product is None:
+                product = Product(
+                    id=str(uuid.uuid4()),
+                    name=clean_name,
+                    category_id=category.id,
+                )
+                new_products[key] = product
+            products.append(product)
+
+        return products, list(new_products.values()), list(new_categories.values())
+
+    def remember(
+        self,
+        products: List[Product],
+        categories: List[Category],
+    ) -> None:
+        # products / categories inserted outside this service
+        self.category_service.remember(categories)
+        products = list(products)
+
+        def put_all() -> None:
+            for product in products:
+                self.index.put_product(product)
+
+        after_commit(put_all)
+
+    def find_duplicate(
+        self,
+        name: str,
+        category_id: Optional[str] = None,
+    ) -> Optional[Product]:
+
+        wanted = normalize(name)
+        best = None
+
+        for view, _ in self.index.similar(
+            name,
+            limit=DEDUPE_CANDIDATES,
+            min_similarity=SUGGEST_SIMILARITY,
+            category_id=category_id,
+        ):
+            candidate = normalize(view.name)
+            max_edits = allowed_edits(min(len(wanted), len(candidate)))
+            edits = edit_distance(wanted, candidate, max_edits)
+            if edits <= max_edits and (best is None or edits < best[0]):
+                best = (edits, view)
+
+        if best is None:
+            return None
+
+        view = best[1]
+        return Product(
+            id=view.id,
+            name=view.name,
+            category_id=view.category_id,
+        )
+
+    # --------------------------------------------------
+    # IMPORT
+    # --------------------------------------------------
+
+    def import_products(
+        self,
+        rows: List[ImportRow],
+        errors: Optional[List[ImportRowError]] = None,
+    ) -> ImportResult:
+
+        errors = list(errors or [])
+        valid = []
+
+        for row, name, category_name in rows:
+            clean_name = (name or "").strip()
+            clean_category = (category_name or "").strip()
+
+            if not clean_name:
+                errors.append(
+                    ImportRowError(row=row, error="Product name cannot be empty")
+                )
+                continue
+
+            valid.append((clean_name, clean_category or DEFAULT_CATEGORY_NAME))
+
+        products, categories = self.product_repo.bulk_create(valid)
+
+        if len(products) > REINDEX_THRESHOLD:
+            self.category_service.remember(categories)
+            self.load_index()
+        else:
+            self.remember(products, categories)
+
+        errors.sort(key=lambda e: e.row)
+        return ImportResult(
+            imported=len(products),
+            skipped=len(valid) - len(products),
+            errors=errors,
+        )
+
     # --------------------------------------------------
     # UPDATE
     # --------------------------------------------------
@@ -118,26 +344,97 @@ class ProductService:
         category_id = None
 
         if clean_category is not None:
-            if clean_category:
-                category = self.category_repo.get_by_name(clean_category)
-                if not category:
-                    category = self.category_repo.create(clean_category)
-                category_id = category.id
-            else:
-                # empty string → fallback default
-                self.category_repo.ensure_default_exists()
-                default_cat = self.category_repo.get_by_name("Other")
-                category_id = default_cat.id
+            # empty string → fallback default
+            category_id = self._ensure_category(clean_category).id
 
-        return self.product_repo.update(
+        product = self.product_repo.update(
             product_id=product_id,
             name=clean_name,
             category_id=category_id,
         )
 
+        if product:
+            after_commit(lambda: self.index.put_product(product))
+        return product
+
+    def _ensure_category(self, clean_category: str) -> Category:
+        # category by name (created if needed), default when empty
+        if clean_category:
+            return self.category_service.create(clean_category)
+        return self.category_service.get_default()
+
     # --------------------------------------------------
     # DELETE
     # --------------------------------------------------
 
     def delete(self, product_id: str) -> bool:
-        return self.product_repo.delete(product_id)
\ No newline at end of file
+        ok = self.product_repo.delete(product_id)
+        if ok:
+            after_commit(lambda: self.index.remove_product(product_id))
+        return ok
+
+
+# --------------------------------------------------
+# NAME MATCHING
+# --------------------------------------------------
+
+def allowed_edits(length: int) -> int:
+    for shorter_than, edits in DEDUPE_MAX_EDITS:
+        if shorter_than is None or length < shorter_than:
+            return edits
+    return 0
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance counting a swap of adjacent characters as one
+    edit; anything above `limit` is reported as limit + 1.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    before: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            cost = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            )
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+
+    return min(previous[-1], limit + 1)
+
+
+# --------------------------------------------------
+# CURSOR (opaque for clients)
+# --------------------------------------------------
+
+def encode_cursor(view: ProductView) -> str:
+    key = [view.category_name, view.name, view.id]
+    raw = json.dumps(key, ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> ProductKey:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+    if (
+        not isinstance(key, list)
+        or len(key) != 3
+        or not all(isinstance(k, str) for k in key)
+    ):
+        raise ValueError("Invalid cursor")
+
+    return key[0], key[1], key[2]
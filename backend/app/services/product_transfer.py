@@ -0,0 +1,167 @@
+import codecs
+import csv
+import io
+import json
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from app.models.views.import_result import ImportRowError
+
+# (row number, name, category name)
+ImportRow = Tuple[int, str, Optional[str]]
+
+CSV_COLUMNS = ["name", "category_name"]
+
+
+class ProductImportReader:
+    """
+    Incremental parser for product imports.
+
+    Accepts CSV (header with `name` and `category_name`/`category`),
+    NDJSON (one {"name", "category_name"} object per line) or a JSON
+    array. CSV/NDJSON are parsed line by line while the body streams in;
+    a JSON array has to be buffered. Bad rows become ImportRowErrors,
+    a malformed body as a whole raises ValueError.
+    """
+
+    def __init__(self, content_type: str):
+        if "csv" in content_type:
+            self.format = "csv"
+        elif "ndjson" in content_type or "jsonl" in content_type:
+            self.format = "ndjson"
+        elif "json" in content_type:
+            self.format = "json"
+        else:
+            raise ValueError("Unsupported content type, use CSV, NDJSON or JSON")
+
+        self.rows: List[ImportRow] = []
+        self.errors: List[ImportRowError] = []
+
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._pending = ""
+        self._json_parts: List[str] = []
+        self._columns: Optional[List[str]] = None
+        self._row = 0
+
+    def feed(self, chunk: bytes) -> None:
+        text = self._decoder.decode(chunk)
+
+        if self.format == "json":
+            self._json_parts.append(text)
+            return
+
+        self._pending += text
+        lines = self._pending.split("\n")
+        self._pending = lines.pop()
+        for line in lines:
+            self._line(line)
+
+    def close(self) -> None:
+        text = self._decoder.decode(b"", final=True)
+
+        if self.format == "json":
+            self._json_parts.append(text)
+            self._json_array("".join(self._json_parts))
+        elif self._pending + text:
+            self._line(self._pending + text)
+
+        self._pending = ""
+
+        if self.format == "csv" and self._columns is None:
+            raise ValueError("CSV header is missing")
+
+    # --------------------------------------------------
+    # INTERNAL
+    # --------------------------------------------------
+
+    def _line(self, line: str) -> None:
+        line = line.rstrip("\r")
+        if not line.strip():
+            return
+
+        if self.format == "csv":
+            self._csv_line(line)
+        else:
+            self._row += 1
+            try:
+                item = json.loads(line)
+            except ValueError:
+                self._error("Invalid JSON")
+                return
+            self._item(item)
+
+    def _csv_line(self, line: str) -> None:
+        values = next(csv.reader([line]))
+
+        if self._columns is None:
+            columns = [v.strip().lower() for v in values]
+            columns = ["category_name" if c == "category" else c for c in columns]
+            if "name" not in columns:
+                raise ValueError("CSV header must contain a 'name' column")
+            self._columns = columns
+            return
+
+        self._row += 1
+        self._item(dict(zip(self._columns, values)))
+
+    def _json_array(self, text: str) -> None:
+        try:
+            items = json.loads(text)
+        except ValueError:
+            raise ValueError("Invalid JSON body")
+
+        if not isinstance(items, list):
+            raise ValueError("JSON body must be an array")
+
+        for item in items:
+            self._row += 1
+            self._item(item)
+
+    def _item(self, item) -> None:
+        if not isinstance(item, dict):
+            self._error("Row must be an object")
+            return
+
+        name = item.get("name")
+        category = item.get("category_name", item.get("category"))
+
+        if not isinstance(name, str) or (
+            category is not None and not isinstance(category, str)
+        ):
+            self._error("name and category_name must be strings")
+            return
+
+        self.rows.append((self._row, name, category))
+
+    def _error(self, message: str) -> None:
+        self.errors.append(ImportRowError(row=self._row, error=message))
+
+
+# --------------------------------------------------
+# EXPORT
+# --------------------------------------------------
+
+def csv_lines(rows: Iterable[dict], batch_size: int = 500) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(CSV_COLUMNS)
+
+    for i, r in enumerate(rows, 1):
+        writer.writerow([r["name"], r["category_name"]])
+        if i % batch_size == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+
+    yield buf.getvalue()
+
+
+def ndjson_lines(rows: Iterable[dict], batch_size: int = 500) -> Iterator[str]:
+    # batched: every chunk of a sync StreamingResponse is a threadpool hop
+    batch = []
+    for r in rows:
+        batch.append(json.dumps(r, ensure_ascii=False) + "\n")
+        if len(batch) == batch_size:
+            yield "".join(batch)
+            batch = []
+
+    yield "".join(batch)
@@ -0,0 +1,53 @@
+import os
+import time
+from typing import Dict, Optional
+
+from app.db.shopping_list_repository import ShoppingListRepository
+from app.services.timer_service import TimerService
+
+TIMER_RETENTION_MIN = float(os.getenv("TIMER_RETENTION_MIN", "60"))
+LIST_RETENTION_DAYS = float(os.getenv("LIST_RETENTION_DAYS", "30"))
+TIMER_PURGE_BATCH = 100
+
+
+class RetentionService:
+    """
+    Keeps finished timers and archived shopping lists from piling up.
+
+    Finished timers are deleted `timer_retention_sec` after they went off
+    (clients get the usual "deleted" event). Lists archived longer than
+    `list_retention_sec` have their items rolled into a summary row
+    (see ShoppingListRepository.compact_archived). Work is done in small
+    transactions, a batch of timers or one list each, so a sweep never
+    holds the write lock for long.
+    """
+
+    def __init__(
+        self,
+        timer_service: TimerService,
+        list_repo: ShoppingListRepository,
+        timer_retention_sec: float = TIMER_RETENTION_MIN * 60,
+        list_retention_sec: float = LIST_RETENTION_DAYS * 86400,
+    ):
+        self.timer_service = timer_service
+        self.list_repo = list_repo
+        self.timer_retention_sec = timer_retention_sec
+        self.list_retention_sec = list_retention_sec
+
+    def sweep(self, now_ts: Optional[int] = None) -> Dict[str, int]:
+        now_ts = int(time.time()) if now_ts is None else now_ts
+
+        timers = 0
+        while True:
+            purged = self.timer_service.purge_finished(
+                int(now_ts - self.timer_retention_sec), TIMER_PURGE_BATCH
+            )
+            timers += purged
+            if purged < TIMER_PURGE_BATCH:
+                break
+
+        lists = 0
+        while self.list_repo.compact_archived(int(now_ts - self.list_retention_sec)):
+            lists += 1
+
+        return {"timers": timers, "lists": lists}
@@ -1,38 +1,126 @@
-from typing import List, Optional
-
-from app.db.product_repository import ProductRepository
+import json
+import threading
+from dataclasses import asdict
+from typing import Callable, List, Optional, Tuple, TypeVar
+
+from app.db.connection import after_commit
+from app.db.data_version import data_versions
+from app.db.shopping_change_repository import ShoppingChangeRepository
 from app.db.shopping_list_repository import ShoppingListRepository
-from app.db.shopping_item_repository import ShoppingItemRepository
+from app.db.shopping_item_repository import (
+    InactiveListError,
+    ShoppingItemRepository,
+)
 from app.models.shopping_list import ShoppingList
 from app.models.views.shopping_item_view import ShoppingItemView
+from app.models.views.shopping_change_view import (
+    ShoppingChangeView,
+    ShoppingChangesView,
+)
+from app.services.event_hub import Event, EventHub
+from app.services.product_service import ProductService
+
+T = TypeVar("T")
 
 
 class ShoppingService:
+    """
+    Shopping list operations.
+
+    The active list id is cached in memory for inserts. Other workers
+    sharing the DB may archive it meanwhile: reads (`get_current_list`,
+    items) resolve the active list in SQL, and inserts into a list that
+    is no longer active are rejected by the DB, after which the cache is
+    reloaded and the insert retried.
+
+    Every edit is also published to `events` (add / quantity / delete /
+    done) for the live WebSocket channel, once committed.
+    """
 
     def __init__(
         self,
-        product_repo: ProductRepository,
+        product_service: ProductService,
         list_repo: ShoppingListRepository,
         item_repo: ShoppingItemRepository,
+        change_repo: ShoppingChangeRepository,
+        events: Optional[EventHub] = None,
     ):
-        self.product_repo = product_repo
+        self.product_service = product_service
         self.list_repo = list_repo
         self.item_repo = item_repo
+        self.change_repo = change_repo
+        self.events = events
+
+        self._lock = threading.Lock()
+        self._active: Optional[ShoppingList] = None
 
     def _ensure_active_list(self) -> ShoppingList:
-        active = self.list_repo.get_active()
-        if active:
-            return active
-        return self.list_repo.create_active()
+        # no DB call under the lock: the caller may hold the write lock
+        with self._lock:
+            active = self._active
+        if active is None:
+            active = self.list_repo.get_or_create_active()
+            self._cache(active)
+        return active
+
+    def _cache(self, active: ShoppingList) -> None:
+        with self._lock:
+            self._active = active
+
+    def _in_active_list(self, write: Callable[[str], T]) -> T:
+        active = self._ensure_active_list()
+        try:
+            return write(active.id)
+        except InactiveListError:
+            # archived by another worker since it was cached
+            with self._lock:
+                if self._active is active:
+                    self._active = None
+            return write(self._ensure_active_list().id)
 
     # ---------- public API ----------
 
     def get_current_list(self) -> ShoppingList:
-        return self._ensure_active_list()
+        # not from the cache: another worker may have archived it
+        active = self.list_repo.get_active() or self.list_repo.get_or_create_active()
+        self._cache(active)
+        return active
+
+    def find_active_list(self) -> Optional[ShoppingList]:
+        # straight from the DB (e.g. inside a read transaction)
+        return self.list_repo.get_active()
+
+    def etag(self) -> str:
+        return data_versions.etag(
+            "shopping_lists", "shopping_items", "products", "category"
+        )
 
     def list_items(self) -> List[ShoppingItemView]:
-        active = self._ensure_active_list()
-        return self.item_repo.list_view_by_list_id(active.id)
+        return self.item_repo.list_active_views()
+
+    def change_seq(self) -> int:
+        return self.change_repo.latest_seq()
+
+    def changes_since(self, since: int, limit: int = 500) -> ShoppingChangesView:
+        oldest, latest = self.change_repo.seq_range()
+        if since < oldest - 1 or since > latest:
+            # log pruned past the client's cursor, or a cursor from another DB
+            return ShoppingChangesView(
+                seq=latest,
+                reset=True,
+                more=False,
+                changes=[],
+            )
+
+        rows = self.change_repo.list_since(since, limit)
+        changes = [_change_view(r) for r in rows]
+
+        return ShoppingChangesView(
+            seq=changes[-1].seq if changes else since,
+            reset=False,
+            more=len(changes) == limit,
+            changes=changes,
+        )
 
     def add_item(
         self,
@@ -44,26 +132,79 @@ class ShoppingService:
         if not clean:
             raise ValueError("name is required")
 
-        active = self._ensure_active_list()
+        product = self.product_service.get_or_create(clean, category)
 
-        product = self.product_repo.get_or_create(clean, category)
+        item = self._in_active_list(
+            lambda list_id: self.item_repo.add(list_id=list_id, product=product)
+        )
+        self.product_service.record_usage(product.id, item.created_at_ts)
+
+        self._publish({"type": "add", "item": item.dict()})
+        return item
+
+    def add_items(
+        self,
+        items: List[Tuple[str, Optional[str]]],
+    ) -> List[ShoppingItemView]:
+
+        if not items:
+            return []
 
-        self.item_repo.add(
-            list_id=active.id,
-            product=product
+        products, new_products, new_categories = (
+            self.product_service.resolve_many(items)
         )
 
-        # повертаємо одразу view через JOIN
-        return self.item_repo.list_view_by_list_id(active.id)[-1]
+        added = self._in_active_list(
+            lambda list_id: self.item_repo.add_many(
+                list_id=list_id,
+                products=products,
+                new_products=new_products,
+                new_categories=new_categories,
+            )
+        )
+
+        self.product_service.remember(added.products, added.categories)
+        for view in added.items:
+            self.product_service.record_usage(view.product_id, view.created_at_ts)
+            self._publish({"type": "add", "item": view.dict()})
+
+        return added.items
 
     def done(self) -> ShoppingList:
-        self.list_repo.archive_active()
-        return self.list_repo.create_active()
+        active = self.list_repo.replace_active()
+        self._cache(active)
+
+        self._publish({"type": "done", "list": asdict(active)})
+        return active
 
     def update_quantity(self, item_id: str, quantity: str) -> None:
         if not quantity or not quantity.strip():
             raise ValueError("quantity cannot be empty")
         self.item_repo.update_quantity(item_id, quantity.strip())
+        self._publish(
+            {"type": "quantity", "item_id": item_id, "quantity": quantity.strip()}
+        )
 
     def delete_item(self, item_id: str) -> None:
         self.item_repo.delete_item(item_id)
+        self._publish({"type": "delete", "item_id": item_id})
+
+    def _publish(self, event: Event) -> None:
+        # not before the change is committed (see `transaction()`)
+        if self.events:
+            after_commit(lambda: self.events.publish(event))
+
+
+def _change_view(row: dict) -> ShoppingChangeView:
+    payload = json.loads(row["payload"]) if row["payload"] else {}
+    op = row["op"]
+
+    return ShoppingChangeView(
+        seq=row["seq"],
+        op=op,
+        list_id=row["list_id"],
+        item_id=row["item_id"],
+        item=ShoppingItemView(**payload) if op == "add" else None,
+        quantity=payload.get("quantity") if op == "quantity" else None,
+        changed_at_ts=row["changed_at_ts"],
+    )
@@ -1,8 +1,13 @@
 import uuid
 import time
+from typing import Iterable, Optional
 
+from app.db.connection import after_commit
 from app.models.timer import Timer, TimerStatus
+from app.db.data_version import data_versions
 from app.db.timer_repository import TimerRepository
+from app.scheduler.timer_scheduler import TimerScheduler
+from app.services.event_hub import Event, EventHub
 from app.services.sound import sound
 
 class TimerNotFoundError(Exception):
@@ -11,8 +16,15 @@ class TimerNotFoundError(Exception):
         self.timer_id = timer_id
 
 class TimerService:
-    def __init__(self, repo: TimerRepository):
+    def __init__(
+        self,
+        repo: TimerRepository,
+        scheduler: TimerScheduler,
+        events: Optional[EventHub] = None,
+    ):
         self.repo = repo
+        self.scheduler = scheduler
+        self.events = events
 
     def list_timers(self) -> list[Timer]:
         timers = self.repo.list_timers()
@@ -25,6 +37,21 @@ class TimerService:
 
         return timers
 
+    def etag(self) -> str:
+        # remaining_sec of running timers is derived from the clock
+        running = self.scheduler.next_deadline() is not None
+        return data_versions.etag(
+            "timers",
+            extra=str(int(time.time())) if running else "",
+        )
+
+    def snapshot(self) -> Event:
+        return {
+            "type": "snapshot",
+            "timers": [t.dict() for t in self.list_timers()],
+            "server_time": int(time.time()),
+        }
+
     def create(self, name: str, duration_sec: int) -> Timer:
         timer = Timer(
             id=str(uuid.uuid4()),
@@ -36,18 +63,23 @@ class TimerService:
         )
 
         self.repo.save(timer)
+        self._schedule(timer)
+        self._publish("created", timer)
         return timer
 
     def start(self, timer_id: str) -> Timer:
-        timer = self.repo.get(timer_id)
+        timer = self._get(timer_id)
 
         timer.status = TimerStatus.RUNNING
         timer.started_at = int(time.time())
+        timer.finished_at = None
         self.repo.save(timer)
+        self._schedule(timer)
+        self._publish("started", timer)
         return timer
 
     def pause(self, timer_id: str) -> Timer:
-        timer = self.repo.get(timer_id)
+        timer = self._get(timer_id)
         if timer.status != TimerStatus.RUNNING:
             return timer
 
@@ -60,17 +92,31 @@ class TimerService:
         timer.started_at = None
 
         self.repo.save(timer)
+        self._cancel(timer.id)
+        self._publish("paused", timer)
         return timer
 
     def delete_timer(self, timer_id: str) -> None:
         ok = self.repo.delete_timer(timer_id)
+        self._cancel(timer_id)
         if not ok:
             raise TimerNotFoundError(timer_id)
 
+        self._publish_deleted(timer_id)
+
+    def purge_finished(self, before_ts: int, limit: int) -> int:
+        # retention: one batch, announced like a delete
+        timer_ids = self.repo.delete_finished(before_ts, limit)
+        for timer_id in timer_ids:
+            self._publish_deleted(timer_id)
+        return len(timer_ids)
+
     def mark_timer_finished(self, timer: Timer) -> None:
         timer.status = TimerStatus.FINISHED
         timer.remaining_sec = 0
+        timer.finished_at = int(time.time())
         self.repo.save(timer)
+        self._publish("finished", timer)
 
         sound.play_timer_finished()
 
@@ -78,11 +124,57 @@ class TimerService:
         timers = self.repo.list_by_status(TimerStatus.RUNNING)
         return timers
 
-    def tick_timers(self, now_ts: int) -> None:
-        timers = self.get_running_timers()
+    def schedule_running_timers(self) -> None:
+        self.scheduler.reset({
+            timer.id: self._deadline(timer)
+            for timer in self.get_running_timers()
+        })
 
-        for timer in timers:
-            elapsed = now_ts - timer.started_at
+    def fire_due_timers(self, timer_ids: Iterable[str], now_ts: int) -> None:
+        for timer_id in timer_ids:
+            timer = self.repo.find(timer_id)
+            if not timer or timer.status != TimerStatus.RUNNING:
+                continue
 
-            if elapsed >= timer.remaining_sec:
+            if now_ts - timer.started_at >= timer.remaining_sec:
                 self.mark_timer_finished(timer)
+            else:
+                self._schedule(timer)
+
+    def _get(self, timer_id: str) -> Timer:
+        timer = self.repo.find(timer_id)
+        if not timer:
+            raise TimerNotFoundError(timer_id)
+        return timer
+
+    # scheduler changes and events wait for the commit (see `transaction()`)
+
+    def _schedule(self, timer: Timer) -> None:
+        deadline = self._deadline(timer)
+        after_commit(lambda: self.scheduler.schedule(timer.id, deadline))
+
+    def _cancel(self, timer_id: str) -> None:
+        after_commit(lambda: self.scheduler.cancel(timer_id))
+
+    def _publish(self, event_type: str, timer: Timer) -> None:
+        if not self.events:
+            return
+
+        event = {"type": event_type, "timer": timer.dict()}
+        after_commit(lambda: self.events.publish(
+            {**event, "server_time": int(time.time())}
+        ))
+
+    def _publish_deleted(self, timer_id: str) -> None:
+        if not self.events:
+            return
+
+        after_commit(lambda: self.events.publish({
+            "type": "deleted",
+            "timer_id": timer_id,
+            "server_time": int(time.time()),
+        }))
+
+    @staticmethod
+    def _deadline(timer: Timer) -> float:
+        return float(timer.started_at + timer.remaining_sec)
@@ -0,0 +1,97 @@
+import math
+import time
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+
+def trigrams(normalized: str) -> Set[str]:
+    # pg_trgm style: every word padded with two leading / one trailing blank
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+class TrigramIndex:
+    """
+    Inverted index trigram -> ids, ranking candidates by Jaccard
+    similarity of their trigram sets.
+
+    Posting lists are visited rarest-first and the scan stops once the
+    time budget is spent, so a lookup stays bounded on large catalogs
+    (at the cost of possibly missing weak candidates).
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self._sizes: Dict[str, int] = {}
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._sizes.clear()
+
+    def add(self, key: str, normalized: str) -> None:
+        grams = trigrams(normalized)
+        self._sizes[key] = len(grams)
+        for g in grams:
+            self._postings[g].add(key)
+
+    def remove(self, key: str, normalized: str) -> None:
+        self._sizes.pop(key, None)
+        for g in trigrams(normalized):
+            ids = self._postings.get(g)
+            if ids is None:
+                continue
+            ids.discard(key)
+            if not ids:
+                del self._postings[g]
+
+    def similar(
+        self,
+        normalized: str,
+        limit: int,
+        min_similarity: float,
+        budget_sec: float,
+    ) -> List[Tuple[str, float]]:
+
+        query = trigrams(normalized)
+        if not query:
+            return []
+
+        deadline = time.perf_counter() + budget_sec
+        shared: Dict[str, int] = defaultdict(int)
+
+        postings = [self._postings[g] for g in query if g in self._postings]
+        postings.sort(key=len)
+
+        # Jaccard >= t needs at least ceil(t * |query|) shared trigrams, so
+        # only the rarest lists can introduce new candidates; the common
+        # ones are just probed for the candidates already found.
+        needed = max(1, math.ceil(min_similarity * len(query)))
+        probe = len(postings) - needed + 1
+        if probe <= 0:
+            return []
+
+        for ids in postings[:probe]:
+            for key in ids:
+                shared[key] += 1
+            if time.perf_counter() > deadline:
+                break
+
+        for ids in postings[probe:]:
+            for key in shared:
+                if key in ids:
+                    shared[key] += 1
+            if time.perf_counter() > deadline:
+                break
+
+        scored = []
+        for key, n in shared.items():
+            score = n / (len(query) + self._sizes[key] - n)
+            if score >= min_similarity:
+                scored.append((key, score))
+
+        scored.sort(key=lambda s: -s[1])
+        return scored[:limit]
@@ -0,0 +1,171 @@
+"""
+200 concurrent clients against the sync routes (FastAPI threadpool) vs.
+the async routes (DB executor).
+
+Both servers are started as uvicorn subprocesses on a scratch DB; the
+sync variant is `sync_app` below, the same services behind plain `def`
+routes. Mixed load: list items, autocomplete, add item.
+
+Run from backend/:  python -m bench.async_db_bench [--clients 200 --seconds 15]
+Needs httpx:  pip install -r bench/requirements.txt
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+from fastapi import FastAPI, Query
+
+from app.db.init_db import init_db
+from app.api.shopping import AddItemRequest
+from app.services.container import product_service, shopping_service
+
+BACKEND = Path(__file__).resolve().parent.parent
+PORT = 8017
+
+# (weight, label)
+MIX = [(6, "list"), (3, "autocomplete"), (1, "add")]
+
+NAMES = ["milk", "bread", "eggs", "cheese", "butter", "apples", "coffee", "rice"]
+
+
+# ---------- sync variant ----------
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    init_db()
+    product_service.load_index()
+    yield
+
+
+sync_app = FastAPI(lifespan=_lifespan)
+
+
+@sync_app.get("/api/shopping/items")
+def _list_items():
+    return shopping_service.list_items()
+
+
+@sync_app.get("/api/products/autocomplete")
+def _autocomplete(q: str = Query(..., min_length=2)):
+    return product_service.autocomplete(q)
+
+
+@sync_app.post("/api/shopping/items")
+def _add_item(req: AddItemRequest):
+    return shopping_service.add_item(req.name, req.category)
+
+
+# ---------- load ----------
+
+async def request(client: httpx.AsyncClient, label: str) -> httpx.Response:
+    name = random.choice(NAMES)
+    if label == "list":
+        return await client.get("/api/shopping/items")
+    if label == "autocomplete":
+        return await client.get("/api/products/autocomplete", params={"q": name[:2]})
+    return await client.post("/api/shopping/items", json={"name": name})
+
+
+async def load(clients: int, seconds: float) -> Dict[str, List[float]]:
+    labels = [label for weight, label in MIX for _ in range(weight)]
+    latencies: Dict[str, List[float]] = {label: [] for _, label in MIX}
+    latencies["error"] = []
+    deadline = time.perf_counter() + seconds
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        while time.perf_counter() < deadline:
+            label = random.choice(labels)
+            start = time.perf_counter()
+            try:
+                res = await request(client, label)
+                ok = res.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies[label if ok else "error"].append(
+                (time.perf_counter() - start) * 1000
+            )
+
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{PORT}",
+        limits=limits,
+        timeout=60,
+    ) as client:
+        await asyncio.gather(*(client_loop(client) for _ in range(clients)))
+
+    return latencies
+
+
+def start_server(target: str, workdir: Path) -> subprocess.Popen:
+    # relative paths (data/app.db, app/db/migrations) resolve in workdir
+    for name in ("app", "bench"):
+        (workdir / name).symlink_to(BACKEND / name)
+    (workdir / "data").mkdir()
+
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", target,
+         "--port", str(PORT), "--log-level", "warning"],
+        cwd=workdir,
+        env={**os.environ, "ENV": "bench"},
+    )
+
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{PORT}/api/shopping/items", timeout=1)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.1)
+
+    proc.kill()
+    raise RuntimeError(f"{target} did not start")
+
+
+def percentile(values: List[float], p: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def run(label: str, target: str, clients: int, seconds: float) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        proc = start_server(target, Path(tmp))
+        try:
+            latencies = asyncio.run(load(clients, seconds))
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    total = sum(len(v) for k, v in latencies.items() if k != "error")
+    print(f"{label}: {total / seconds:.0f} req/s, {len(latencies['error'])} errors")
+    for _, name in MIX:
+        values = sorted(latencies[name])
+        if not values:
+            continue
+        print(
+            f"  {name:<13} n={len(values):<6} "
+            f"p50={statistics.median(values):7.1f}ms "
+            f"p99={percentile(values, 0.99):7.1f}ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=15)
+    args = parser.parse_args()
+
+    print(f"{args.clients} clients, {args.seconds:.0f}s each")
+    run("sync  (threadpool) ", "bench.async_db_bench:sync_app", args.clients, args.seconds)
+    run("async (db executor)", "app.main:app", args.clients, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+TEXT UUID keys (migrations up to 011) vs. 16-byte BLOB keys (012).
+
+Seeds a large TEXT-keyed DB, copies it and runs migration 012 on the
+copy, then compares both (after VACUUM): file and per-table/index size,
+page cache hit rate with SQLite's default 2MB cache, and JOIN latency
+of the shopping list view, the product listing and a full join. BLOB
+latency is given for the bare SQL and with the UUID converters the app
+connections use (see app/db/uuid_key.py).
+
+Run from backend/:  python -m bench.compact_keys_bench
+"""
+import ctypes
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+import _sqlite3
+
+from app.db.connection import open_connection
+from app.db.init_db import MIGRATIONS_PATH
+from app.db.shopping_item_repository import VIEW_SQL
+from app.db.uuid_key import to_key
+
+CATEGORIES = 300
+PRODUCTS = 100_000
+LISTS = 5_000
+ITEMS_PER_LIST = 100
+CHANGES = 200_000
+QUERIES = 2_000
+
+CACHE_KIB = 2000  # SQLite default cache_size
+DBSTATUS_CACHE_HIT = 7
+DBSTATUS_CACHE_MISS = 8
+
+LISTING_SQL = """
+    SELECT p.id, p.name, p.category_id, c.name AS category_name
+    FROM products p
+    JOIN category c ON c.id = p.category_id
+    WHERE (c.name, p.name, p.id) > (?, ?, ?)
+    ORDER BY c.name ASC, p.name ASC, p.id ASC
+    LIMIT 200
+"""
+
+FULL_JOIN_SQL = """
+    SELECT c.name, COUNT(*)
+    FROM shopping_items si
+    JOIN products p ON p.id = si.product_id
+    JOIN category c ON c.id = p.category_id
+    GROUP BY c.name
+"""
+
+_lib = ctypes.CDLL(_sqlite3.__file__)
+
+
+def cache_counters(conn: sqlite3.Connection) -> Tuple[int, int]:
+    # sqlite3_db_status() is not exposed by the sqlite3 module; the
+    # sqlite3* handle is the first field after the object header
+    db = ctypes.c_void_p.from_address(id(conn) + object.__basicsize__)
+    counters = []
+    for op in (DBSTATUS_CACHE_HIT, DBSTATUS_CACHE_MISS):
+        cur, high = ctypes.c_int(), ctypes.c_int()
+        _lib.sqlite3_db_status(db, op, ctypes.byref(cur), ctypes.byref(high), 1)
+        counters.append(cur.value)
+    return counters[0], counters[1]
+
+
+def seed(db_path: Path, rnd: random.Random) -> None:
+    conn = open_connection(db_path)
+    for m in sorted(MIGRATIONS_PATH.glob("*.sql")):
+        if int(m.name.split("_")[0]) < 12:
+            conn.executescript(m.read_text())
+
+    categories = [str(uuid.uuid4()) for _ in range(CATEGORIES)]
+    products = [str(uuid.uuid4()) for _ in range(PRODUCTS)]
+    conn.executemany(
+        "INSERT INTO category (id, name) VALUES (?, ?)",
+        [(c, f"category {i}") for i, c in enumerate(categories)],
+    )
+    conn.executemany(
+        "INSERT INTO products (id, name, category_id) VALUES (?, ?, ?)",
+        [(p, f"product {i}", rnd.choice(categories)) for i, p in enumerate(products)],
+    )
+    conn.executemany(
+        "INSERT INTO product_usage (product_id, score, last_used_ts) VALUES (?, 1, 0)",
+        [(p,) for p in products],
+    )
+
+    # items can only be added to the active list: fill each, then archive
+    for n in range(LISTS):
+        list_id = str(uuid.uuid4())
+        conn.execute(
+            "INSERT INTO shopping_lists (id, status, created_at_ts) VALUES (?, 'active', ?)",
+            (list_id, n),
+        )
+        conn.executemany(
+            """
+            INSERT INTO shopping_items (id, list_id, product_id, created_at_ts)
+            VALUES (?, ?, ?, ?)
+            """,
+            [
+                (str(uuid.uuid4()), list_id, rnd.choice(products), n)
+                for _ in range(ITEMS_PER_LIST)
+            ],
+        )
+        if n < LISTS - 1:
+            conn.execute("UPDATE shopping_lists SET status = 'archived' WHERE id = ?", (list_id,))
+
+    conn.execute(
+        f"""
+        INSERT INTO shopping_changes (list_id, op, item_id, payload, changed_at_ts)
+        SELECT list_id, 'delete', id, NULL, 0 FROM shopping_items LIMIT {CHANGES}
+        """
+    )
+    conn.commit()
+    conn.close()
+
+
+def migrate(db_path: Path) -> float:
+    conn = open_connection(db_path)
+    start = time.perf_counter()
+    conn.executescript((MIGRATIONS_PATH / "012_compact_uuid_keys.sql").read_text())
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+
+def vacuum(db_path: Path) -> None:
+    conn = open_connection(db_path)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.execute("VACUUM")
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+def sizes(db_path: Path) -> List[Tuple[str, int]]:
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        """
+        SELECT name, SUM(pgsize) FROM dbstat
+        WHERE name NOT LIKE 'sqlite_%' OR name LIKE 'sqlite_autoindex_%'
+        GROUP BY name
+        ORDER BY 2 DESC
+        """
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+def sample(conn, sql: str, params: List[tuple]) -> Tuple[List[float], float]:
+    # latencies (ms) and page cache hit rate over the whole run
+    cache_counters(conn)
+    samples = []
+    for p in params:
+        start = time.perf_counter()
+        conn.execute(sql, p).fetchall()
+        samples.append((time.perf_counter() - start) * 1000)
+    hits, misses = cache_counters(conn)
+    return sorted(samples), hits / max(hits + misses, 1)
+
+
+def measure(
+    label: str, conn: sqlite3.Connection, to_param: Callable, rnd: random.Random
+) -> dict:
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA cache_size = -{CACHE_KIB}")
+
+    lists = [r[0] for r in conn.execute("SELECT id FROM shopping_lists")]
+    listing = conn.execute(
+        """
+        SELECT c.name, p.name, p.id FROM products p
+        JOIN category c ON c.id = p.category_id
+        """
+    ).fetchall()
+
+    result = {"label": label}
+    result["list view"] = sample(
+        conn,
+        VIEW_SQL + " WHERE si.list_id = ? ORDER BY si.created_at_ts ASC, si.rowid ASC",
+        [(to_param(rnd.choice(lists)),) for _ in range(QUERIES)],
+    )
+    result["listing page"] = sample(
+        conn,
+        LISTING_SQL,
+        [
+            (row[0], row[1], to_param(row[2]))
+            for row in (rnd.choice(listing) for _ in range(QUERIES))
+        ],
+    )
+    result["full join"] = sample(conn, FULL_JOIN_SQL, [()] * 5)
+    conn.close()
+    return result
+
+
+def main() -> None:
+    rnd = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        text_db = Path(tmp) / "text.db"
+        blob_db = Path(tmp) / "blob.db"
+
+        start = time.perf_counter()
+        seed(text_db, rnd)
+        print(
+            f"seeded {PRODUCTS} products, {LISTS * ITEMS_PER_LIST} items, "
+            f"{CHANGES} changes in {time.perf_counter() - start:.0f}s"
+        )
+
+        shutil.copy(text_db, blob_db)
+        print(f"migration 012: {migrate(blob_db):.1f}s")
+
+        for db in (text_db, blob_db):
+            vacuum(db)
+
+        print()
+        print(f"{'table / index':<32} {'TEXT':>10} {'BLOB':>10}")
+        blob_sizes = dict(sizes(blob_db))
+        for name, size in sizes(text_db):
+            print(f"{name:<32} {size / 1024:9.0f}K {blob_sizes.get(name, 0) / 1024:9.0f}K")
+
+        print()
+        for db in (text_db, blob_db):
+            print(f"{db.name}: {db.stat().st_size / 2**20:.1f}M")
+
+        results = [
+            measure("TEXT", open_connection(text_db), lambda v: v, rnd),
+            measure("BLOB sql", sqlite3.connect(blob_db), lambda v: v, rnd),
+            measure("BLOB app", open_connection(blob_db), to_key, rnd),
+        ]
+
+    print()
+    print(f"{'':<14}" + "".join(f"{r['label']:>36}" for r in results))
+    for query in ("list view", "listing page", "full join"):
+        cells = []
+        for r in results:
+            samples, hit_rate = r[query]
+            cells.append(
+                f"p50 {statistics.median(samples):7.2f}ms "
+                f"p99 {samples[int(len(samples) * 0.99)]:7.2f}ms "
+                f"{hit_rate:4.0%}"
+            )
+        print(f"{query:<14}" + "".join(f"{c:>36}" for c in cells))
+    print(f"(p50 / p99 latency, page cache hit rate with a {CACHE_KIB}KiB cache)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Per-query latency: fresh connection per call vs. the shared pool.
+
+Run from backend/:  python -m bench.connection_bench
+"""
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.db.connection import ConnectionPool, open_connection
+
+QUERIES = 5000
+
+
+def seed(db_path: Path) -> None:
+    conn = open_connection(db_path)
+    conn.execute(
+        "CREATE TABLE timers (id TEXT PRIMARY KEY, name TEXT, status TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO timers VALUES (?, ?, ?)",
+        [(str(i), f"timer {i}", "running") for i in range(50)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def run(label: str, query) -> None:
+    samples = []
+    for _ in range(QUERIES):
+        start = time.perf_counter()
+        query()
+        samples.append((time.perf_counter() - start) * 1_000_000)
+
+    samples.sort()
+    print(
+        f"{label:<22} "
+        f"mean={statistics.mean(samples):8.1f}us  "
+        f"p50={samples[len(samples) // 2]:8.1f}us  "
+        f"p99={samples[int(len(samples) * 0.99)]:8.1f}us"
+    )
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        seed(db_path)
+
+        sql = "SELECT * FROM timers WHERE id = ?"
+        leaked = []
+
+        def fresh():
+            # previous behaviour: new connection + pragmas, never closed
+            conn = open_connection(db_path)
+            conn.execute(sql, ("7",)).fetchone()
+            leaked.append(conn)
+
+        pool = ConnectionPool(db_path)
+
+        def pooled():
+            with pool.connection() as conn:
+                conn.execute(sql, ("7",)).fetchone()
+
+        print(f"python {sys.version.split()[0]} / {QUERIES} queries")
+        run("fresh connection", fresh)
+        run("connection pool", pooled)
+
+        for conn in leaked:
+            conn.close()
+        pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Bursty concurrent writes: commit per write vs. the group commit writer.
+
+Every thread saves timers and adds shopping items through the
+repositories, all threads start at once. Run on a scratch DB per mode.
+
+Run from backend/:  python -m bench.group_commit_bench [--threads 32 --writes 100]
+"""
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+from app.db import connection
+from app.db.connection import ConnectionPool
+from app.db.init_db import init_db
+from app.db.product_repository import ProductRepository
+from app.db.shopping_item_repository import ShoppingItemRepository
+from app.db.shopping_list_repository import ShoppingListRepository
+from app.db.timer_repository import TimerRepository
+from app.db.write_queue import writer
+from app.models.timer import Timer, TimerStatus
+
+# (label, group commit window in ms or None for commit per write)
+MODES = [("per write", None), ("group 1ms", 1), ("group 2ms", 2), ("group 5ms", 5)]
+
+
+def run(label: str, window_ms: Optional[float], threads: int, writes: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.pool = ConnectionPool(Path(tmp) / "app.db", max_size=threads)
+        connection.read_pool = ConnectionPool(
+            Path(tmp) / "app.db", max_size=threads, read_only=True
+        )
+        init_db()
+
+        writer.enabled = window_ms is not None
+        writer.window_sec = (window_ms or 0) / 1000
+
+        timers = TimerRepository()
+        items = ShoppingItemRepository()
+        list_id = ShoppingListRepository().get_or_create_active().id
+        product = ProductRepository().get_or_create(
+            "bench", "00000000-0000-0000-0000-000000000000"
+        )
+
+        latencies: List[float] = []
+        start_gate = threading.Barrier(threads)
+
+        def worker() -> None:
+            start_gate.wait()
+            for i in range(writes):
+                start = time.perf_counter()
+                if i % 2:
+                    items.add(list_id=list_id, product=product)
+                else:
+                    timers.save(Timer(
+                        id=str(uuid.uuid4()),
+                        name="bench",
+                        duration_sec=60,
+                        remaining_sec=60,
+                        status=TimerStatus.PAUSED,
+                    ))
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        pool = [threading.Thread(target=worker) for _ in range(threads)]
+        started = time.perf_counter()
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        elapsed = time.perf_counter() - started
+
+        writer.stop()
+        connection.close_connections()
+
+    latencies.sort()
+    print(
+        f"{label:<10} {len(latencies) / elapsed:8.0f} writes/s  "
+        f"p50={statistics.median(latencies):7.2f}ms  "
+        f"p99={latencies[int(len(latencies) * 0.99)]:7.2f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--writes", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads x {args.writes} writes")
+    for label, window_ms in MODES:
+        run(label, window_ms, args.threads, args.writes)
+
+
+if __name__ == "__main__":
+    main()
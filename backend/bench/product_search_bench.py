@@ -0,0 +1,103 @@
+"""
+Product search on a 100k catalog: LOWER(name) LIKE '%q%' vs. FTS5 prefix.
+
+Run from backend/:  python -m bench.product_search_bench
+"""
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from app.db.connection import open_connection
+from app.db.init_db import MIGRATIONS_PATH
+from app.db.product_repository import fts_prefix_query
+
+PRODUCTS = 100_000
+CATEGORIES = 40
+QUERIES = 300
+
+SYLLABLES = [
+    "mo", "lo", "ko", "ch", "ee", "se", "ba", "na", "to", "ma",
+    "хлі", "бу", "мо", "ло", "ко", "сир", "яй", "це", "ка", "ва",
+]
+
+LIKE_SQL = """
+    SELECT p.id, p.name, p.category_id, c.name AS category_name
+    FROM products p
+    JOIN category c ON c.id = p.category_id
+    WHERE LOWER(p.name) LIKE ?
+    ORDER BY p.name ASC
+    LIMIT 10
+"""
+
+FTS_SQL = """
+    SELECT p.id, p.name, p.category_id, c.name AS category_name
+    FROM products_fts f
+    JOIN products p ON p.rowid = f.rowid
+    JOIN category c ON c.id = p.category_id
+    WHERE products_fts MATCH ?
+    ORDER BY bm25(products_fts, 10.0, 1.0), p.name ASC
+    LIMIT 10
+"""
+
+
+def word(rnd: random.Random) -> str:
+    return "".join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(2, 4)))
+
+
+def seed(conn, rnd: random.Random) -> None:
+    for m in sorted(MIGRATIONS_PATH.glob("*.sql")):
+        conn.executescript(m.read_text())
+
+    categories = [(uuid.uuid4().bytes, f"{word(rnd)} {i}") for i in range(CATEGORIES)]
+    conn.executemany("INSERT INTO category (id, name) VALUES (?, ?)", categories)
+    # names repeat within a category now and then: (name, category) is unique
+    conn.executemany(
+        "INSERT OR IGNORE INTO products (id, name, category_id) VALUES (?, ?, ?)",
+        [
+            (
+                uuid.uuid4().bytes,
+                " ".join(word(rnd) for _ in range(rnd.randint(1, 3))).capitalize(),
+                rnd.choice(categories)[0],
+            )
+            for _ in range(PRODUCTS)
+        ],
+    )
+    conn.commit()
+
+
+def run(conn, label: str, sql: str, params) -> None:
+    samples = []
+    for p in params:
+        start = time.perf_counter()
+        conn.execute(sql, (p,)).fetchall()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    print(
+        f"{label:<8} "
+        f"mean={statistics.mean(samples):7.2f}ms  "
+        f"p50={samples[len(samples) // 2]:7.2f}ms  "
+        f"p99={samples[int(len(samples) * 0.99)]:7.2f}ms"
+    )
+
+
+def main() -> None:
+    rnd = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = open_connection(Path(tmp) / "bench.db")
+        seed(conn, rnd)
+
+        queries = [word(rnd)[: rnd.randint(2, 4)] for _ in range(QUERIES)]
+
+        print(f"{PRODUCTS} products / {QUERIES} prefix queries")
+        run(conn, "LIKE", LIKE_SQL, [f"%{q.lower()}%" for q in queries])
+        run(conn, "FTS5", FTS_SQL, [fts_prefix_query(q) for q in queries])
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
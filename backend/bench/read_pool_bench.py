@@ -0,0 +1,106 @@
+"""
+Shopping list reads while a timer-loop-like writer saves timers: reads on
+the shared read-write pool vs. the read-only pool.
+
+Run from backend/:  python -m bench.read_pool_bench [--readers 8 --seconds 10]
+"""
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import List
+
+from app.db import connection
+from app.db.connection import ConnectionPool
+from app.db.init_db import init_db
+from app.db.product_repository import ProductRepository
+from app.db.shopping_item_repository import ShoppingItemRepository
+from app.db.shopping_list_repository import ShoppingListRepository
+from app.db.timer_repository import TimerRepository
+from app.models.timer import Timer, TimerStatus
+
+ITEMS = 300
+TIMERS = 20
+
+
+def seed() -> None:
+    items = ShoppingItemRepository()
+    products = ProductRepository()
+    list_id = ShoppingListRepository().get_or_create_active().id
+    for i in range(ITEMS):
+        product = products.get_or_create(
+            f"product {i}", "00000000-0000-0000-0000-000000000000"
+        )
+        items.add(list_id=list_id, product=product)
+
+
+def run(label: str, shared: bool, readers: int, seconds: float) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "app.db"
+        connection.pool = ConnectionPool(db_path, max_size=readers + 1)
+        connection.read_pool = connection.pool if shared else ConnectionPool(
+            db_path, max_size=readers, read_only=True
+        )
+        init_db()
+        seed()
+
+        timers = TimerRepository()
+        items = ShoppingItemRepository()
+        ids = [str(uuid.uuid4()) for _ in range(TIMERS)]
+        deadline = time.perf_counter() + seconds
+        latencies: List[float] = []
+        writes = [0]
+
+        def writer() -> None:
+            # a tick of the timer loop: save every running timer
+            while time.perf_counter() < deadline:
+                for timer_id in ids:
+                    timers.save(Timer(
+                        id=timer_id,
+                        name="bench",
+                        duration_sec=600,
+                        remaining_sec=600,
+                        status=TimerStatus.RUNNING,
+                    ))
+                writes[0] += len(ids)
+
+        def reader() -> None:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                items.list_active_views()
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        threads = [threading.Thread(target=writer)]
+        threads += [threading.Thread(target=reader) for _ in range(readers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        connection.close_connections()
+
+    latencies.sort()
+    print(
+        f"{label:<10} {len(latencies) / seconds:7.0f} reads/s  "
+        f"p50={statistics.median(latencies):6.2f}ms  "
+        f"p99={latencies[int(len(latencies) * 0.99)]:6.2f}ms  "
+        f"{writes[0] / seconds:6.0f} writes/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    print(f"{args.readers} readers, {ITEMS} items, 1 writer, {args.seconds:.0f}s")
+    run("shared", True, args.readers, args.seconds)
+    run("read-only", False, args.readers, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+How many shopping WebSocket clients one uvicorn process holds.
+
+Opens sockets to /api/shopping/ws in steps; after every step one item is
+added (and deleted again) over HTTP and the time until every socket has
+received the broadcast is measured. Stops at the first step where
+sockets fail to connect or miss the broadcast.
+
+Start the server separately (ulimit -n must allow the socket count):
+    ulimit -n 65536; python -m uvicorn app.main:app --port 8000
+
+Run from backend/:
+    python -m bench.shopping_ws_load --sockets 5000 --step 500 --pid <uvicorn pid>
+"""
+import argparse
+import asyncio
+import json
+import time
+import urllib.request
+from typing import List, Optional
+
+import websockets
+
+BROADCAST_TIMEOUT = 30
+
+
+def http(base: str, method: str, path: str, body: Optional[dict] = None) -> dict:
+    req = urllib.request.Request(
+        base + path,
+        data=json.dumps(body).encode() if body is not None else None,
+        headers={"Content-Type": "application/json"},
+        method=method,
+    )
+    with urllib.request.urlopen(req) as res:
+        return json.load(res)
+
+
+def rss_mb(pid: Optional[int]) -> str:
+    if pid is None:
+        return "-"
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return f"{int(line.split()[1]) / 1024:.0f}MB"
+    return "-"
+
+
+async def wait_for(ws, item_id: str, received: List[float]) -> None:
+    while True:
+        event = json.loads(await ws.recv())
+        if event.get("type") == "add" and event["item"]["id"] == item_id:
+            received.append(time.perf_counter())
+            return
+
+
+async def broadcast(base: str, sockets: list) -> List[float]:
+    # item id is only known after the POST: buffer events until then
+    start = time.perf_counter()
+    item = await asyncio.to_thread(
+        http, base, "POST", "/api/shopping/items", {"name": "load test"}
+    )
+
+    received: List[float] = []
+    waits = [wait_for(ws, item["id"], received) for ws in sockets]
+    try:
+        await asyncio.wait_for(asyncio.gather(*waits), BROADCAST_TIMEOUT)
+    except asyncio.TimeoutError:
+        pass
+
+    await asyncio.to_thread(http, base, "DELETE", f"/api/shopping/items/{item['id']}")
+    await drain(sockets)
+    return [(t - start) * 1000 for t in received]
+
+
+async def drain(sockets: list) -> None:
+    # swallow the delete events
+    async def one(ws):
+        try:
+            while True:
+                event = json.loads(await asyncio.wait_for(ws.recv(), 1))
+                if event.get("type") == "delete":
+                    return
+        except asyncio.TimeoutError:
+            pass
+
+    await asyncio.gather(*(one(ws) for ws in sockets))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--sockets", type=int, default=5000)
+    parser.add_argument("--step", type=int, default=500)
+    parser.add_argument("--pid", type=int, help="uvicorn pid, for RSS")
+    args = parser.parse_args()
+
+    ws_url = args.url.replace("http", "ws", 1) + "/api/shopping/ws"
+    sockets = []
+
+    print(f"{'sockets':>8} {'failed':>7} {'got':>7} {'p50':>9} {'max':>9} {'rss':>7}")
+
+    while len(sockets) < args.sockets:
+        results = await asyncio.gather(
+            *(websockets.connect(ws_url, open_timeout=30) for _ in range(args.step)),
+            return_exceptions=True,
+        )
+        failed = [r for r in results if isinstance(r, Exception)]
+        sockets.extend(r for r in results if not isinstance(r, Exception))
+
+        latencies = sorted(await broadcast(args.url, sockets))
+        p50 = f"{latencies[len(latencies) // 2]:.1f}ms" if latencies else "-"
+        top = f"{latencies[-1]:.1f}ms" if latencies else "-"
+        print(
+            f"{len(sockets):>8} {len(failed):>7} {len(latencies):>7} "
+            f"{p50:>9} {top:>9} {rss_mb(args.pid):>7}"
+        )
+
+        if failed or len(latencies) < len(sockets):
+            break
+
+    await asyncio.gather(*(ws.close() for ws in sockets), return_exceptions=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+"""
+Write and read latency per storage profile (app/db/storage_profile.py),
+next to the settings used before profiles existed.
+
+Each profile gets a fresh DB with a product catalogue and an active list,
+then runs repository calls one at a time: item adds (one commit each),
+the active list view, product search and a walk over the whole product
+listing. The DB file is warm in the OS page cache, so this shows fsync
+cost and cache/mmap effects, not cold SD-card reads.
+
+Run from backend/:  python -m bench.storage_profile_bench [--products 20000 --ops 300]
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from app.db import connection
+from app.db.connection import ConnectionPool
+from app.db.init_db import init_db
+from app.db.product_repository import ProductRepository
+from app.db.shopping_item_repository import ShoppingItemRepository
+from app.db.shopping_list_repository import ShoppingListRepository
+from app.db.storage_profile import PROFILES, StorageProfile
+
+# what every connection got before profiles: WAL defaults, 10s busy timeout
+BASELINE = StorageProfile(
+    synchronous="FULL",
+    cache_kib=2000,
+    mmap_mib=0,
+    temp_store="DEFAULT",
+    busy_timeout_ms=10_000,
+)
+
+CATEGORIES = 50
+
+
+def timed(fn: Callable[[], object], n: int) -> List[float]:
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return sorted(samples)
+
+
+def run(profile: StorageProfile, products: int, ops: int) -> Dict[str, List[float]]:
+    rnd = random.Random(7)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "app.db"
+        connection.pool = ConnectionPool(db_path, max_size=2, profile=profile)
+        connection.read_pool = ConnectionPool(
+            db_path, max_size=2, read_only=True, profile=profile
+        )
+        init_db()
+
+        product_repo = ProductRepository()
+        items = ShoppingItemRepository()
+        created, _ = product_repo.bulk_create(
+            [(f"product {i}", f"category {i % CATEGORIES}") for i in range(products)]
+        )
+        list_id = ShoppingListRepository().get_or_create_active().id
+
+        def add_item() -> None:
+            items.add(list_id=list_id, product=rnd.choice(created))
+
+        def walk_listing() -> None:
+            for _ in product_repo.iter_view_rows():
+                pass
+
+        results = {
+            "item add": timed(add_item, ops),
+            "list view": timed(items.list_active_views, ops),
+            "search": timed(
+                lambda: product_repo.search_views_by_name(f"product {rnd.randrange(100)}"),
+                ops,
+            ),
+            "listing walk": timed(walk_listing, 5),
+        }
+        connection.close_connections()
+        return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=20_000)
+    parser.add_argument("--ops", type=int, default=300)
+    args = parser.parse_args()
+
+    profiles = {"(before)": BASELINE, **PROFILES}
+    results = {name: run(p, args.products, args.ops) for name, p in profiles.items()}
+
+    print(f"{args.products} products, {args.ops} ops per query; p50 / p99 ms")
+    print(f"{'':<14}" + "".join(f"{name:>20}" for name in results))
+    for query in next(iter(results.values())):
+        cells = []
+        for r in results.values():
+            samples = r[query]
+            p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+            cells.append(f"{statistics.median(samples):7.2f} / {p99:7.2f}")
+        print(f"{query:<14}" + "".join(f"{c:>20}" for c in cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -13,8 +13,17 @@ if [ -z "$MODE" ]; then
   MODE="dev"
 fi
 
+if [ "$MODE" = "test" ]; then
+  exec python -m pytest "${@:2}"
+fi
+
 export ENV=$MODE
 
+# SQLite tuning, see app/db/storage_profile.py
+if [ "$ENV" = "prod" ]; then
+  export DB_STORAGE_PROFILE="${DB_STORAGE_PROFILE:-kiosk-sd}"
+fi
+
 echo "Starting backend in $ENV mode..."
 
 if [ "$ENV" = "prod" ]; then
@@ -0,0 +1,372 @@
+"""
+Query plans of the repositories.
+
+Seeds a scratch DB with large tables, calls every public repository
+method once and runs EXPLAIN QUERY PLAN on each SQL statement it
+executed. Fails on:
+  - a full table / index scan of a large table, unless the method is a
+    deliberate full read (FULL_SCANS),
+  - a seeded lookup that finds nothing (RETURNS_ROWS),
+  - a public repository method not exercised below,
+  - a foreign key whose child columns have no index (FK checks and
+    ON DELETE actions scan the child table otherwise).
+
+Run from backend/:  python -m pytest tests/test_query_plans.py
+"""
+import inspect
+import re
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import pytest
+
+from app.db import connection
+from app.db.category_repository import CategoryRepository
+from app.db.connection import ConnectionPool, transaction
+from app.db.idempotency_repository import IdempotencyRepository
+from app.db.init_db import init_db
+from app.db.product_repository import ProductRepository
+from app.db.shopping_change_repository import ShoppingChangeRepository
+from app.db.shopping_item_repository import ShoppingItemRepository
+from app.db.shopping_list_repository import ShoppingListRepository
+from app.db.timer_repository import TimerRepository
+from app.db.uuid_key import to_key
+from app.models.product import Product
+from app.models.timer import Timer, TimerStatus
+
+# tables with at least this many rows count as large
+LARGE_ROWS = 1000
+
+CATEGORIES = 200
+PRODUCTS = 20_000
+LISTS = 200
+ITEMS = 20_000
+TIMERS = 5_000
+CHANGES = 20_000
+KEYS = 5_000
+
+# methods that read a whole table on purpose
+FULL_SCANS = {
+    "ProductRepository.list_all",       # index rebuild
+    "ProductRepository.list_usage",     # index rebuild
+    "ProductRepository.iter_view_rows",  # export
+    "ProductRepository.bulk_create",    # import dedupe
+    "TimerRepository.list_timers",      # every timer is shown
+}
+
+# reads of seeded rows: an empty result means the lookup key was not
+# bound the way the column stores it
+RETURNS_ROWS = {
+    "CategoryRepository.get_by_id",
+    "ProductRepository.get_by_id",
+    "ProductRepository.get_view_by_id",
+    "ShoppingItemRepository.list_view_by_list_id",
+    "ShoppingItemRepository.list_active_views",
+    "TimerRepository.find",
+    "IdempotencyRepository.find",
+}
+
+SCAN_RE = re.compile(r"^SCAN (\w+)(?: USING (?:COVERING )?INDEX \S+)?$")
+TABLE_RE = re.compile(
+    r"\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)"
+    r"(?:\s+(?:AS\s+)?(?!ON\b|WHERE\b|JOIN\b|LEFT\b|ORDER\b|GROUP\b|LIMIT\b"
+    r"|SET\b|VALUES\b|SELECT\b|RETURNING\b)(\w+))?",
+    re.IGNORECASE,
+)
+
+
+def uid(name: str) -> str:
+    # stable UUID for a short seed id like "p12"
+    return str(uuid.uuid5(uuid.NAMESPACE_OID, name))
+
+
+def key(name: str) -> bytes:
+    return to_key(uid(name))
+
+
+def seed(conn) -> None:
+    conn.executemany(
+        "INSERT INTO category (id, name) VALUES (?, ?)",
+        [(key(f"c{i}"), f"Category {i}") for i in range(CATEGORIES)],
+    )
+    conn.executemany(
+        "INSERT INTO products (id, name, category_id) VALUES (?, ?, ?)",
+        [
+            (key(f"p{i}"), f"product {i}", key(f"c{i % CATEGORIES}"))
+            for i in range(PRODUCTS)
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO product_usage (product_id, score, last_used_ts) VALUES (?, ?, ?)",
+        [(key(f"p{i}"), 1.0, i) for i in range(0, PRODUCTS, 4)],
+    )
+    # items can only be added to the active list: fill each, then archive
+    for n in reversed(range(LISTS)):
+        conn.execute(
+            "INSERT INTO shopping_lists (id, status, created_at_ts) VALUES (?, 'active', ?)",
+            (key(f"l{n}"), n),
+        )
+        conn.executemany(
+            """
+            INSERT INTO shopping_items (id, list_id, product_id, created_at_ts)
+            VALUES (?, ?, ?, ?)
+            """,
+            [
+                (key(f"i{i}"), key(f"l{n}"), key(f"p{i % (PRODUCTS // 2)}"), i)
+                for i in range(n, ITEMS, LISTS)
+            ],
+        )
+        if n:
+            conn.execute(
+                """
+                UPDATE shopping_lists SET status = 'archived', archived_at_ts = ?
+                WHERE id = ?
+                """,
+                (n, key(f"l{n}")),
+            )
+    conn.executemany(
+        """
+        INSERT INTO timers
+            (id, name, duration_sec, remaining_sec, status, started_at, finished_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (key(f"t{i}"), f"timer {i}", 60, 60,
+             "running" if i < 10 else "finished", None, None if i < 10 else i)
+            for i in range(TIMERS)
+        ],
+    )
+    conn.executemany(
+        """
+        INSERT INTO shopping_changes (list_id, op, item_id, payload, changed_at_ts)
+        VALUES (?, 'delete', ?, NULL, ?)
+        """,
+        [(key(f"l{i % LISTS}"), key(f"i{i}"), i) for i in range(CHANGES)],
+    )
+    conn.executemany(
+        "INSERT INTO idempotency_keys (key, result, created_at_ts) VALUES (?, '{}', ?)",
+        [(f"k{i}", i) for i in range(KEYS)],
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+
+
+def exercises() -> List[Tuple[str, Callable[[], object]]]:
+    categories = CategoryRepository()
+    products = ProductRepository()
+    items = ShoppingItemRepository()
+    lists = ShoppingListRepository()
+    changes = ShoppingChangeRepository()
+    timers = TimerRepository()
+    keys = IdempotencyRepository()
+    product = Product(id=uid("p1"), name="product 1", category_id=uid("c1"))
+    timer = Timer(
+        id=uid("t-new"), name="new", duration_sec=60, remaining_sec=60,
+        status=TimerStatus.PAUSED,
+    )
+
+    return [
+        ("CategoryRepository.create", lambda: categories.create("New category")),
+        ("CategoryRepository.ensure_default_exists", categories.ensure_default_exists),
+        ("CategoryRepository.get_by_id", lambda: categories.get_by_id(uid("c5"))),
+        ("CategoryRepository.get_by_name", lambda: categories.get_by_name("category 5")),
+        ("CategoryRepository.list_all", categories.list_all),
+        ("CategoryRepository.update", lambda: categories.update(uid("c6"), "Renamed")),
+        ("CategoryRepository.delete", lambda: categories.delete(uid("c7"))),
+        ("ProductRepository.get_by_id", lambda: products.get_by_id(uid("p5"))),
+        ("ProductRepository.get_by_name_category_id",
+         lambda: products.get_by_name_category_id("product 5", uid("c5"))),
+        ("ProductRepository.list_all", products.list_all),
+        ("ProductRepository.list_usage", products.list_usage),
+        ("ProductRepository.get_view_by_id", lambda: products.get_view_by_id(uid("p5"))),
+        ("ProductRepository.list_all_views", lambda: products.list_all_views(50)),
+        ("ProductRepository.list_all_views (cursor)",
+         lambda: products.list_all_views(50, ("Category 50", "product 50", uid("p50")))),
+        ("ProductRepository.iter_view_rows", lambda: list(products.iter_view_rows())),
+        ("ProductRepository.create", lambda: products.create("brand new", uid("c1"))),
+        ("ProductRepository.get_or_create",
+         lambda: products.get_or_create("product 9", uid("c9"))),
+        ("ProductRepository.bulk_create",
+         lambda: products.bulk_create([("imported", "Category 3")])),
+        ("ProductRepository.update", lambda: products.update(uid("p10"), name="renamed")),
+        ("ProductRepository.delete", lambda: products.delete(uid(f"p{PRODUCTS - 1}"))),
+        ("ProductRepository.search_views_by_name",
+         lambda: products.search_views_by_name("prod 12")),
+        ("ShoppingItemRepository.list_view_by_list_id",
+         lambda: items.list_view_by_list_id(uid("l3"))),
+        ("ShoppingItemRepository.list_active_views", items.list_active_views),
+        ("ShoppingItemRepository.add", lambda: items.add(uid("l0"), product)),
+        ("ShoppingItemRepository.add_many", lambda: items.add_many(uid("l0"), [product])),
+        ("ShoppingItemRepository.update_quantity",
+         lambda: items.update_quantity(uid("i0"), "2")),
+        ("ShoppingItemRepository.delete_item", lambda: items.delete_item(uid("i200"))),
+        ("ShoppingItemRepository.clear", lambda: items.clear(uid("l5"))),
+        ("ShoppingChangeRepository.list_since", lambda: changes.list_since(CHANGES - 100)),
+        ("ShoppingChangeRepository.latest_seq", changes.latest_seq),
+        ("ShoppingChangeRepository.seq_range", changes.seq_range),
+        ("TimerRepository.save", lambda: timers.save(timer)),
+        ("TimerRepository.find", lambda: timers.find(uid("t2"))),
+        ("TimerRepository.list_by_status", lambda: timers.list_by_status(TimerStatus.RUNNING)),
+        ("TimerRepository.list_timers", timers.list_timers),
+        ("TimerRepository.delete_timer", lambda: timers.delete_timer(uid("t3"))),
+        ("TimerRepository.delete_finished", lambda: timers.delete_finished(20, 5)),
+        ("IdempotencyRepository.find", lambda: keys.find(["k1", "k2", "missing"])),
+        ("IdempotencyRepository.save", lambda: keys.save("k-new", {}, int(time.time()))),
+        ("IdempotencyRepository.prune", lambda: keys.prune(100)),
+        ("ShoppingListRepository.get_active", lists.get_active),
+        ("ShoppingListRepository.get_or_create_active", lists.get_or_create_active),
+        ("ShoppingListRepository.replace_active", lists.replace_active),
+        ("ShoppingListRepository.compact_archived", lambda: lists.compact_archived(LISTS)),
+    ]
+
+
+def unexercised(names: List[str]) -> List[str]:
+    exercised = {n.split(" ")[0] for n in names}
+    missing = []
+    for repo in (
+        CategoryRepository, ProductRepository, ShoppingItemRepository,
+        ShoppingListRepository, ShoppingChangeRepository, TimerRepository,
+        IdempotencyRepository,
+    ):
+        for name, _ in inspect.getmembers(repo, inspect.isfunction):
+            if name.startswith("_") or name in ("get_conn", "get_read_conn"):
+                continue
+            if f"{repo.__name__}.{name}" not in exercised:
+                missing.append(f"{repo.__name__}.{name}")
+    return missing
+
+
+def unindexed_foreign_keys(conn) -> List[str]:
+    missing = []
+    tables = [r[0] for r in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND sql NOT LIKE 'CREATE VIRTUAL%'"
+    )]
+    for table in tables:
+        indexed = [
+            [c[2] for c in conn.execute(f"PRAGMA index_info('{ix[1]}')")]
+            for ix in conn.execute(f"PRAGMA index_list('{table}')")
+        ]
+        pk = [r[1] for r in sorted(
+            conn.execute(f"PRAGMA table_info('{table}')"), key=lambda r: r[5]
+        ) if r[5]]
+        indexed.append(pk)
+
+        fks: Dict[int, List[str]] = {}
+        for fk in conn.execute(f"PRAGMA foreign_key_list('{table}')"):
+            fks.setdefault(fk[0], []).append(fk[3])
+        for columns in fks.values():
+            if not any(ix[:len(columns)] == columns for ix in indexed):
+                missing.append(f"{table}({', '.join(columns)})")
+    return missing
+
+
+def full_scans(conn, sql: str, sizes: Dict[str, int]) -> Tuple[List[str], List[str]]:
+    aliases = {}
+    for table, alias in TABLE_RE.findall(sql):
+        aliases[table] = table
+        if alias:
+            aliases[alias] = table
+
+    plan = [r[3] for r in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+    scans = []
+    for detail in plan:
+        m = SCAN_RE.match(detail)
+        if m and sizes.get(aliases.get(m.group(1), m.group(1)), 0) >= LARGE_ROWS:
+            scans.append(detail)
+    return plan, scans
+
+
+# --------------------------------------------------
+# FIXTURE
+# --------------------------------------------------
+
+@dataclass
+class Run:
+    # per call: what it returned and (sql, plan, large table scans)
+    results: Dict[str, object] = field(default_factory=dict)
+    statements: Dict[str, List[Tuple[str, List[str], List[str]]]] = field(
+        default_factory=dict
+    )
+    unindexed: List[str] = field(default_factory=list)
+
+
+@pytest.fixture(scope="module")
+def run(tmp_path_factory) -> Iterator[Run]:
+    db_path = tmp_path_factory.mktemp("query_plans") / "app.db"
+    saved = connection.pool, connection.read_pool
+    connection.pool = ConnectionPool(db_path)
+    connection.read_pool = ConnectionPool(db_path, read_only=True)
+
+    try:
+        init_db()
+        CategoryRepository().ensure_default_exists()
+        result = Run()
+
+        with connection.pool.connection() as conn:
+            seed(conn)
+            sizes = {
+                t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+                for (t,) in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' "
+                    "AND sql NOT LIKE 'CREATE VIRTUAL%'"
+                ).fetchall()
+            }
+            result.unindexed = unindexed_foreign_keys(conn)
+
+        traced: List[Tuple[str, str]] = []
+        current = [""]
+
+        with transaction() as tx:
+            tx.set_trace_callback(lambda sql: traced.append((current[0], sql)))
+            for name, call in exercises():
+                current[0] = name
+                result.results[name] = call()
+            tx.set_trace_callback(None)
+
+            # statements firing triggers are traced once per trigger run
+            for name, sql in dict.fromkeys(traced):
+                head = sql.lstrip().split(None, 1)[0].upper()
+                if head not in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH"):
+                    continue
+                plan, scans = full_scans(tx, sql, sizes)
+                result.statements.setdefault(name, []).append((sql, plan, scans))
+
+        yield result
+    finally:
+        connection.close_connections()
+        connection.pool, connection.read_pool = saved
+
+
+# --------------------------------------------------
+# TESTS
+# --------------------------------------------------
+
+CALLS = [name for name, _ in exercises()]
+
+
+@pytest.mark.parametrize("name", CALLS)
+def test_no_full_scan_of_large_table(run: Run, name: str):
+    if name.split(" ")[0] in FULL_SCANS:
+        pytest.skip("reads the whole table on purpose")
+
+    flagged = [
+        " ".join(sql.split()) + "\n    " + "\n    ".join(plan)
+        for sql, plan, scans in run.statements.get(name, [])
+        if scans
+    ]
+    assert not flagged, "\n".join(flagged)
+
+
+@pytest.mark.parametrize("name", sorted(RETURNS_ROWS))
+def test_seeded_lookup_returns_rows(run: Run, name: str):
+    assert run.results[name], "no rows for seeded data"
+
+
+def test_foreign_keys_indexed(run: Run):
+    assert run.unindexed == []
+
+
+def test_every_repository_method_exercised():
+    assert unexercised(CALLS) == []
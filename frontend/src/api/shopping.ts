@@ -20,6 +20,80 @@ export async function listShoppingItems() {
   return res.json();
 }
 
+export type ShoppingItem = {
+  id: string;
+  name: string;
+  category?: string | null;
+  quantity: string;
+};
+
+export type ShoppingChange = {
+  seq: number;
+  op: "add" | "quantity" | "delete" | "clear" | "archive";
+  list_id: string;
+  item_id: string | null;
+  item: ShoppingItem | null;
+  quantity: string | null;
+};
+
+export type ShoppingChanges = {
+  seq: number;
+  reset: boolean;
+  more: boolean;
+  changes: ShoppingChange[];
+};
+
+// full list plus the change-log position it reflects
+export async function loadShoppingItems(): Promise<{
+  items: ShoppingItem[];
+  seq: number;
+}> {
+  const res = await fetch(`${SHOPPING_API}/items`);
+  if (!res.ok) throw new Error("list items failed");
+  return {
+    items: await res.json(),
+    seq: Number(res.headers.get("X-Change-Seq") ?? 0),
+  };
+}
+
+export async function listShoppingChanges(
+  since: number,
+): Promise<ShoppingChanges> {
+  const res = await fetch(`${SHOPPING_API}/changes?since=${since}`);
+  if (!res.ok) throw new Error("list changes failed");
+  return res.json();
+}
+
+// ops are idempotent, so replaying ones the list already has is fine
+export function applyShoppingChanges(
+  items: ShoppingItem[],
+  changes: ShoppingChange[],
+): ShoppingItem[] {
+  let next = items;
+  for (const c of changes) {
+    switch (c.op) {
+      case "add":
+        if (c.item && !next.some((i) => i.id === c.item!.id)) {
+          next = [...next, c.item];
+        }
+        break;
+      case "quantity":
+        next = next.map((i) =>
+          i.id === c.item_id ? { ...i, quantity: c.quantity ?? i.quantity } : i,
+        );
+        break;
+      case "delete":
+        next = next.filter((i) => i.id !== c.item_id);
+        break;
+      case "clear":
+      case "archive":
+        next = [];
+        break;
+    }
+  }
+  return next;
+}
+
 export async function updateItemQuantity(
   itemId: string,
   quantity: string
@@ -35,4 +109,55 @@ export async function deleteShoppingItem(itemId: string) {
   await fetch(`${SHOPPING_API}/items/${itemId}`, {
     method: "DELETE"
   });
-}
\ No newline at end of file
+}
+
+export type ShoppingEvent =
+  | { type: "add"; item: ShoppingItem }
+  | { type: "quantity"; item_id: string; quantity: string }
+  | { type: "delete"; item_id: string }
+  | { type: "done"; list: { id: string } };
+
+// live edits of all clients; onOpen fires on every (re)connect so the
+// caller can catch up on what it missed through /changes
+export function subscribeShopping(
+  onEvent: (event: ShoppingEvent) => void,
+  onOpen: () => void,
+): () => void {
+  const url = new URL(`${SHOPPING_API}/ws`, window.location.href);
+  url.protocol = url.protocol === "https:" ? "wss:" : "ws:";
+
+  let socket: WebSocket;
+  let closed = false;
+  let retry: ReturnType<typeof setTimeout>;
+
+  function connect() {
+    socket = new WebSocket(url);
+    socket.onopen = onOpen;
+    socket.onmessage = (e) => onEvent(JSON.parse(e.data));
+    socket.onclose = () => {
+      if (!closed) retry = setTimeout(connect, 2000);
+    };
+  }
+
+  connect();
+
+  return () => {
+    closed = true;
+    clearTimeout(retry);
+    socket.close();
+  };
+}
+
+export function eventToChange(event: ShoppingEvent): ShoppingChange {
+  const base = { seq: 0, list_id: "", item_id: null, item: null, quantity: null };
+  switch (event.type) {
+    case "add":
+      return { ...base, op: "add", item_id: event.item.id, item: event.item };
+    case "quantity":
+      return { ...base, op: "quantity", item_id: event.item_id, quantity: event.quantity };
+    case "delete":
+      return { ...base, op: "delete", item_id: event.item_id };
+    case "done":
+      return { ...base, op: "archive", list_id: event.list.id };
+  }
+}
@@ -7,6 +7,33 @@ export async function listTimers() {
   return res.json();
 }
 
+export interface TimerStreamHandlers {
+  onSnapshot: (timers: any[]) => void;
+  onTimer: (timer: any) => void;
+  onDeleted: (timerId: string) => void;
+}
+
+/* server pushes a snapshot on (re)connect, then one event per change */
+export function subscribeTimers(handlers: TimerStreamHandlers): () => void {
+  const source = new EventSource(`${TIMERS_API}/stream`);
+
+  source.addEventListener("snapshot", (e: MessageEvent) => {
+    handlers.onSnapshot(JSON.parse(e.data).timers);
+  });
+
+  for (const type of ["created", "started", "paused", "finished"]) {
+    source.addEventListener(type, (e: MessageEvent) => {
+      handlers.onTimer(JSON.parse(e.data).timer);
+    });
+  }
+
+  source.addEventListener("deleted", (e: MessageEvent) => {
+    handlers.onDeleted(JSON.parse(e.data).timer_id);
+  });
+
+  return () => source.close();
+}
+
 export async function deleteTimer(timerId: string): Promise<void> {
     const res = await fetch(`${TIMERS_API}/${timerId}`, {
       method: "DELETE"
@@ -1,11 +1,16 @@
-import { useEffect, useMemo, useState } from "react";
+import { useEffect, useMemo, useRef, useState } from "react";
 import { autocompleteProducts, type Product } from "../api/products";
 import { listCategories, type Category } from "../api/category";
 import {
   addShoppingItem,
-  listShoppingItems,
+  applyShoppingChanges,
+  eventToChange,
+  listShoppingChanges,
+  loadShoppingItems,
   updateItemQuantity,
   deleteShoppingItem,
+  subscribeShopping,
+  type ShoppingItem,
 } from "../api/shopping";
 import type { OverlayActions } from "../ui/overlayActions";
 import QuantityField from "../ui/inputs/QuantityField";
@@ -14,13 +19,6 @@ import { TrashIcon, PlusIcon, CartIcon } from "../ui/icons";
 
 import { useTranslation } from "react-i18next";
 
-type ShoppingItem = {
-  id: string;
-  name: string;
-  category?: string | null;
-  quantity: string;
-};
-
 interface Props {
   onClose: () => void;
   registerActions: (a: OverlayActions) => void;
@@ -35,6 +33,7 @@ export default function ShoppingOverlay({
   const [query, setQuery] = useState("");
   const [suggestions, setSuggestions] = useState<Product[]>([]);
   const [items, setItems] = useState<ShoppingItem[]>([]);
+  const seq = useRef<number | null>(null);
 
   const [categories, setCategories] = useState<Category[]>([]);
   const [addingNew, setAddingNew] = useState(false);
@@ -51,12 +50,39 @@ export default function ShoppingOverlay({
     registerActions({ onCancel: onClose });
     refreshItems();
     loadCategories();
-    return unregisterActions;
+
+    // live edits; every (re)connect catches up via the change log
+    const unsubscribe = subscribeShopping(
+      (event) => setItems((prev) => applyShoppingChanges(prev, [eventToChange(event)])),
+      () => refreshItems(),
+    );
+
+    return () => {
+      unsubscribe();
+      unregisterActions();
+    };
   }, []);
 
   async function refreshItems() {
-    const res = await listShoppingItems();
-    setItems(res || []);
+    if (seq.current === null) {
+      const res = await loadShoppingItems();
+      seq.current = res.seq;
+      setItems(res.items || []);
+      return;
+    }
+
+    // only the edits since the last sync
+    let more = true;
+    while (more) {
+      const res = await listShoppingChanges(seq.current);
+      if (res.reset) {
+        seq.current = null;
+        return refreshItems();
+      }
+      seq.current = res.seq;
+      setItems((prev) => applyShoppingChanges(prev, res.changes));
+      more = res.more;
+    }
   }
 
   async function loadCategories() {
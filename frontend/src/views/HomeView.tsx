@@ -1,6 +1,6 @@
 import { useEffect, useState } from "react";
 
-import { listTimers, deleteTimer } from "../api/timers";
+import { subscribeTimers, deleteTimer } from "../api/timers";
 import TimerCard from "../components/TimerCard";
 import TimerOverlay from "../components/TimerOverlay";
 import ShoppingOverlay from "../components/ShoppingOverlay";
@@ -22,10 +22,16 @@ interface Timer {
   status: "idle" | "running" | "paused" | "finished";
 }
 
+/* remaining_sec is as of synced_at (client clock) */
+interface SyncedTimer extends Timer {
+  synced_at: number;
+}
+
 /* ---------- component ---------- */
 
 export default function HomeView() {
-  const [timers, setTimers] = useState<Timer[]>([]);
+  const [syncedTimers, setSyncedTimers] = useState<SyncedTimer[]>([]);
+  const [now, setNow] = useState(Date.now());
   const [overlayActions, setOverlayActions] = useState<OverlayActions | null>(
     null,
   );
@@ -35,15 +41,28 @@ export default function HomeView() {
 
   /* ---------- data ---------- */
 
-  async function refresh() {
-    const data = await listTimers();
-    setTimers(data);
-  }
-
   useEffect(() => {
-    refresh();
-    const i = setInterval(refresh, 1000);
-    return () => clearInterval(i);
+    const unsubscribe = subscribeTimers({
+      onSnapshot: (list) => setSyncedTimers(list.map(stampTimer)),
+
+      onTimer: (timer) =>
+        setSyncedTimers((prev) =>
+          prev.some((t) => t.id === timer.id)
+            ? prev.map((t) => (t.id === timer.id ? stampTimer(timer) : t))
+            : [...prev, stampTimer(timer)],
+        ),
+
+      onDeleted: (timerId) =>
+        setSyncedTimers((prev) => prev.filter((t) => t.id !== timerId)),
+    });
+
+    // local countdown only, no requests
+    const i = setInterval(() => setNow(Date.now()), 1000);
+
+    return () => {
+      unsubscribe();
+      clearInterval(i);
+    };
   }, []);
 
   /* ---------- hardware / keyboard ---------- */
@@ -67,6 +86,8 @@ export default function HomeView() {
 
   /* ---------- derived state ---------- */
 
+  const timers = syncedTimers.map((timer) => countDown(timer, now));
+
   const activeTimer = timers.find((t) => t.status === "running");
 
   /* ---------- render ---------- */
@@ -144,7 +165,6 @@ export default function HomeView() {
                     message: t("removeTimerText", { name: timer.name }),
                     onConfirm: async () => {
                       await deleteTimer(timer.id);
-                      refresh();
                     },
                   })
                 }
@@ -162,7 +182,6 @@ export default function HomeView() {
           onStarted={() => {
             overlays.clear();
             setOverlayActions(null);
-            refresh();
           }}
           registerActions={setOverlayActions}
           unregisterActions={() => setOverlayActions(null)}
@@ -213,6 +232,17 @@ export default function HomeView() {
 
 /* ---------- helpers ---------- */
 
+function stampTimer(timer: Timer): SyncedTimer {
+  return { ...timer, synced_at: Date.now() };
+}
+
+function countDown(timer: SyncedTimer, now: number): Timer {
+  if (timer.status !== "running") return timer;
+
+  const elapsed = Math.floor((now - timer.synced_at) / 1000);
+  return { ...timer, remaining_sec: Math.max(0, timer.remaining_sec - elapsed) };
+}
+
 function sortTimers(a: Timer, b: Timer) {
   const priority: Record<Timer["status"], number> = {
     running: 0,